@@ -0,0 +1,76 @@
+"""
+Guards the start up cost of the sipper command line.
+
+Runs `python -X importtime -m sipper` for the commands that should never
+need the heavy dependencies, fails if any of them is imported, and fails
+if the time spent importing sipper's own modules exceeds the budget.
+
+usage: python benchmarks/importtime.py [budget-ms]
+"""
+import os
+import subprocess
+import sys
+
+
+# milliseconds allowed for importing sipper and everything it pulls in
+BUDGET_MS = 100
+
+# modules that cost hundreds of milliseconds and must stay lazy
+HEAVY = [ 'pandas', 'numpy', 'openpyxl', 'pyarrow' ]
+
+COMMANDS = [
+    [ '--version' ],
+    [ '--help' ],
+    [ '--manual' ]
+]
+
+
+def importtime(args):
+    src = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [ src ] + [ p for p in [ env.get('PYTHONPATH') ] if p ])
+
+    process = subprocess.run(
+        [ sys.executable, '-X', 'importtime', '-m', 'sipper', *args ],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+        env=env, universal_newlines=True)
+
+    # lines read 'import time: <self> | <cumulative> | <indented name>',
+    # with two spaces of indentation per level of nesting
+    imported = []
+    toplevel = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not cumulative.strip().isdigit():
+            continue
+        imported.append(name.strip())
+        if not name.startswith('  '):
+            toplevel[name.strip()] = int(cumulative) / 1000
+    return imported, toplevel
+
+
+def main():
+    budget = float(sys.argv[1]) if 1 < len(sys.argv) else BUDGET_MS
+    failed = False
+
+    for args in COMMANDS:
+        imported, toplevel = importtime(args)
+        heavy = { m.split('.')[0] for m in imported } & set(HEAVY)
+        spent = sum(ms for m, ms in toplevel.items() if m.startswith('sipper'))
+
+        print(f'sipper {" ".join(args)}: {spent:.1f} ms importing sipper')
+        if heavy:
+            print(f'\tfail: imports {", ".join(sorted(heavy))}')
+            failed = True
+        if spent > budget:
+            print(f'\tfail: over the {budget:.0f} ms budget')
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+"""
+Measures the conversion throughput of sipper on a synthetic corpus.
+
+Generates corpora of synthetic .raw8 files with the AVS84 driver's writer
+and times each stage of the pipeline on them in a fresh process: probing
+headers, parsing series, and converting to CSV, to a spreadsheet per file
+and to a single workbook. Reports files/s, MB/s of input and the peak RSS
+of every run. Results can be saved as JSON and compared against a saved
+baseline, failing if any stage slowed down beyond the tolerance.
+
+usage: python benchmarks/throughput.py [--sizes 10,100,1000]
+           [--cases probe,parse,csv,sheet,book] [--samples 3400] [--axes 3]
+           [--corpus <directory>] [--json <file>] [--compare <file>]
+           [--tolerance 0.2]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# files generated per batch of random data
+BATCH = 256
+
+# reads the paths on stdin like the command line does
+PROBE = """
+import sys
+from sipper import Parcel
+from sipper.__main__ import load_avs84
+parcel = Parcel(avs_samples={samples}, avs_dimensions={axes})
+for path in sys.stdin.read().splitlines():
+    load_avs84(parcel, path, probe={probe})
+"""
+
+CASES = {
+    'probe': lambda o, shape: [ '-c', PROBE.format(probe=True, **shape) ],
+    'parse': lambda o, shape: [ '-c', PROBE.format(probe=False, **shape) ],
+    'csv':   lambda o, shape: [ '-m', 'sipper', '-y', '-c', '-o', o, '-' ],
+    'sheet': lambda o, shape: [ '-m', 'sipper', '-y', '-x', '-o', o, '-' ],
+    'book':  lambda o, shape: [ '-m', 'sipper', '-y', '-X',
+                                '-o', os.path.join(o, 'book.xlsx'), '-' ]
+}
+
+
+def generate_corpus(directory, count, samples=3400, axes=3, seed=0):
+    """Write `count` synthetic .raw8 files into `directory`, drawing the
+    series of many files from the generator at once. Returns the paths."""
+    import numpy as np
+    import pandas as pd
+    from sipper.driver import Data, DataType, find_driver
+    from sipper.driver.avs84 import AXIS_LABELS
+
+    driver = find_driver('avs84')
+    rng = np.random.default_rng(seed)
+    wavelengths = np.linspace(200.0, 1100.0, samples, dtype='<f4')
+    labels = AXIS_LABELS + [ str(axis) for axis in range(3, axes) ]
+
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for start in range(0, count, BATCH):
+        batch = min(BATCH, count - start)
+        series = rng.random((batch, samples, axes), dtype=np.float32)
+        if axes:
+            series[:, :, 0] = wavelengths
+        for offset in range(batch):
+            path = os.path.join(directory, f'{start + offset:06d}.raw8')
+            frame = pd.DataFrame(series[offset], columns=labels[:axes], copy=False)
+            with open(path, 'wb') as fout:
+                driver.write(None, [ Data('series', DataType.FRAME, frame) ], fout)
+            paths.append(path)
+    return paths
+
+
+def corpus(directory, count, samples, axes):
+    """Reuse a corpus generated earlier with the same shape, if any."""
+    directory = os.path.join(directory, f'{count}x{samples}x{axes}')
+    paths = sorted(os.path.join(directory, name)
+                   for name in os.listdir(directory)) \
+            if os.path.isdir(directory) else []
+    if len(paths) != count:
+        shutil.rmtree(directory, ignore_errors=True)
+        paths = generate_corpus(directory, count, samples, axes)
+    return paths
+
+
+def run(args, paths, output):
+    """Run one case in its own process fed the paths on stdin. Returns
+    the elapsed seconds and the peak RSS of that process in bytes."""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [ SRC ] + [ p for p in [ env.get('PYTHONPATH') ] if p ])
+
+    os.makedirs(output, exist_ok=True)
+    start = time.perf_counter()
+    process = subprocess.Popen([ sys.executable, *args ], env=env,
+        stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    process.stdin.write('\n'.join(paths).encode())
+    process.stdin.close()
+    stderr = process.stderr.read()
+    # wait4 reports the usage of this child alone, unlike getrusage
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - start
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    if process.returncode:
+        raise RuntimeError(f'{" ".join(args[:3])} failed:\n{stderr.decode()}')
+    return elapsed, usage.ru_maxrss * 1024
+
+
+def compare(results, baseline, tolerance):
+    """Return a message for each stage slower than in the baseline."""
+    known = { (r['case'], r['files']): r for r in baseline }
+    slower = []
+    for result in results:
+        before = known.get((result['case'], result['files']))
+        if before is None:
+            continue
+        ratio = before['files_per_s'] / result['files_per_s']
+        if ratio > 1 + tolerance:
+            slower.append(f'{result["case"]} on {result["files"]} files is '
+                          f'{(ratio - 1) * 100:.0f}% slower than the baseline')
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Measures the conversion throughput of sipper.')
+    parser.add_argument('--sizes', default='10,100,1000',
+        help='comma separated file counts of the corpora')
+    parser.add_argument('--cases', default=','.join(CASES),
+        help='comma separated stages among ' + ', '.join(CASES))
+    parser.add_argument('--samples', type=int, default=3400)
+    parser.add_argument('--axes', type=int, default=3)
+    parser.add_argument('--corpus',
+        help='directory to keep corpora in between runs')
+    parser.add_argument('--json', help='save the results to a file')
+    parser.add_argument('--compare', help='baseline results to compare with')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+        help='slow down allowed relative to the baseline')
+    options = parser.parse_args()
+
+    sys.path.insert(0, SRC)
+    sizes = [ int(size) for size in options.sizes.split(',') ]
+    cases = options.cases.split(',')
+    for case in cases:
+        if case not in CASES:
+            parser.error(f'unknown case {case}')
+
+    shape = { 'samples': options.samples, 'axes': options.axes }
+    extra = [ '-avs:s', str(options.samples), '-avs:d', str(options.axes) ]
+
+    scratch = tempfile.mkdtemp(prefix='sipper-bench-')
+    results = []
+    try:
+        root = options.corpus or os.path.join(scratch, 'corpus')
+        for size in sizes:
+            paths = corpus(root, size, options.samples, options.axes)
+            megabytes = sum(os.path.getsize(p) for p in paths) / 1e6
+
+            for case in cases:
+                output = os.path.join(scratch, 'output', case)
+                args = CASES[case](output, shape)
+                if '-m' == args[0]:
+                    args = args[:-1] + extra + args[-1:]
+                elapsed, rss = run(args, paths, output)
+                shutil.rmtree(output, ignore_errors=True)
+
+                result = {
+                    'case': case,
+                    'files': size,
+                    'seconds': elapsed,
+                    'files_per_s': size / elapsed,
+                    'mb_per_s': megabytes / elapsed,
+                    'peak_rss_mb': rss / 1e6
+                }
+                results.append(result)
+                print(f'{case:>6} {size:>7} files: {elapsed:8.2f} s '
+                      f'{result["files_per_s"]:9.1f} files/s '
+                      f'{result["mb_per_s"]:8.1f} MB/s '
+                      f'{result["peak_rss_mb"]:8.1f} MB peak RSS')
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    if options.json:
+        with open(options.json, 'w') as fout:
+            json.dump({ 'samples': options.samples, 'axes': options.axes,
+                        'results': results }, fout, indent=2)
+
+    if options.compare:
+        with open(options.compare, 'r') as fin:
+            slower = compare(results, json.load(fin)['results'],
+                             options.tolerance)
+        for message in slower:
+            print(f'\tfail: {message}')
+        sys.exit(1 if slower else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -38,4 +38,6 @@ def getelse(parcel, name, default=None):
     item = parcel[name]
     if item is None:
         return default
-    return item
\ No newline at end of file
+    return item
+
+from sipper.api import open
@@ -1,11 +1,15 @@
+import io
 import os
 import sys
-import struct
+from functools import partial
+from itertools import chain
 
-import pandas as pd
-
-from sipper import getelse 
+from sipper import Parcel, getelse 
 from sipper.getopt import Option, Switch, getopt 
+from sipper.driver import Data, DataType, find_driver
+
+# pandas, numpy and the drivers are imported where they are first needed
+# so that --version, --help and failed probes start up quickly.
 
 
 __version__ = '0.0.5-dev'
@@ -14,22 +18,73 @@ terse = \
 f"""
 sipper - a data file format converter.
 usage: sipper [OPTIONS] [<input>...]
+       sipper [OPTIONS] --watch <directory>
+       sipper [OPTIONS] --verify <input>...
+       sipper [OPTIONS] --index <catalog> <input>...
+       sipper [-j <jobs>] --serve <socket>
+       sipper --connect <socket> [OPTIONS] [<input>...]
        sipper --help
        sipper --manual
 
+    An input or output of '-' stands for stdin or stdout. An input
+    may be a zip or tar archive, or 'archive::pattern' of its members.
+
 OPTIONS
     -v, --version                  Display version information and exit.
     -o, --output                   Specify the output file or directory.
+    -j, --jobs                     Convert inputs in the given number
+                                       of parallel processes.
+    --prefetch                     Read inputs ahead on threads while
+                                       converting, e.g. on network shares.
     -avs:s, --avs:samples          Manually specify AVS84 sample count.
     -avs:d, --avs:dimensions       Manually specify AVS84 axis count.
+    --axes                         Read only the given axes, e.g. y,z.
+    --samples                      Read only samples start:stop.
+    --wavelength                   Read only wavelengths low:high nm.
     -i, --write-index              Enable row indices in output files.
     -h, --write-header             Enable column labels in output files.
     -y, --override                 Override any existing input.
+    --incremental                  Only convert new or changed inputs.
+    --hash                         Compare content hashes of touched
+                                       inputs with --incremental.
+    --prune                        Remove outputs of vanished inputs
+                                       with --incremental.
+    --watch                        Convert new files in a directory as
+                                       they are written.
+    --verify                       Check headers and sizes of inputs
+                                       and directories, report as JSON.
+    --index                        Record the headers of inputs and
+                                       directories in an SQLite catalog.
+    --catalog                      Convert the inputs recorded in an
+                                       SQLite catalog.
+    --where                        Select --catalog inputs by an SQL
+                                       condition.
+    --serve                        Serve conversions on a socket from
+                                       a warm process.
+    --connect                      Run the conversion on a --serve
+                                       socket instead.
     -x, --excel-sheet              Write data to individual 
                                        spreadsheets.
     -X, --excel-book               Write data to a single spreadsheet
                                        with a sheet per input file.
     -c, --csv                      Write data to individual CSV files.
+    --float-format                 Format floats in CSV output, e.g. %.6g.
+    --compress                     Compress CSV and NumPy outputs with
+                                       gzip, zstd or xz.
+    --parquet                      Write data to individual Parquet files.
+    --feather                      Write data to individual Feather
+                                       (Arrow IPC) files.
+    --npy                          Write data to individual NumPy arrays.
+    --stack                        Stack all data into a single NumPy
+                                       array of files x axes x samples.
+    --resample                     Interpolate onto a wavelength grid,
+                                       start:stop:step or a .raw8 file.
+    --reduce                       Write statistics across all inputs,
+                                       any of mean,std,min,max,median.
+    --dark                         Subtract a dark frame with --reduce.
+    --stats                        Report time per stage, bytes read
+                                       and written, and peak memory.
+    --stats-json                   Save the --stats figures as JSON.
 
     --help                         Display this terse help page.
     --manual                       Display the complete manual page.
@@ -48,6 +103,11 @@ manual = \
 f"""
 sipper - a data file format converter.
 usage: sipper [OPTIONS] [<input>...]
+       sipper [OPTIONS] --watch <directory>
+       sipper [OPTIONS] --verify <input>...
+       sipper [OPTIONS] --index <catalog> <input>...
+       sipper [-j <jobs>] --serve <socket>
+       sipper --connect <socket> [OPTIONS] [<input>...]
        sipper --help
        sipper --manual
 
@@ -56,6 +116,20 @@ DESCRIPTION
     data files to different, more standardized formats such as Excel
     spreadsheets and CSV.
 
+    An input of '-' reads stdin. If stdin starts with an AVS84 signature
+    it is converted as a single .raw8 file; otherwise it is read as a list
+    of input paths, one per line. An output of '-' writes CSV to stdout,
+    which is also the default when '-' is the only input. Reports then go
+    to stderr. When several inputs are written to stdout, each CSV record
+    is preceded by a line '#frame<TAB><input><TAB><lines>' giving the
+    input path and the number of lines in the record that follows.
+
+    Zip and tar archives, compressed or not, are read without extracting
+    them. An archive stands for its .raw8 members, 'data.tar.gz::run1/*'
+    for the members matching a pattern and 'data.zip::run1/a.raw8' for a
+    single member. Members are read into memory one at a time and their
+    outputs are named after the member and placed next to the archive.
+
 EXAMPLES
     sipper -x file
         Convert 'file' in the current working directory into a
@@ -71,6 +145,52 @@ EXAMPLES
         labels (-h), and write the results into the 'out' directory
         (-o out).
 
+    sipper -c < measure/file.raw8 -
+        Convert the .raw8 file piped in through stdin (-) into CSV
+        written to stdout.
+
+    find measure -name '*.raw8' | sipper -h -c - | downstream
+        Convert every .raw8 file found under 'measure', whose paths are
+        piped in through stdin (-), into a single stream of framed CSV
+        records on stdout.
+
+    sipper -c -o out 'bundle.tar.gz::run1/*.raw8'
+        Convert the .raw8 files under 'run1' in the archive
+        'bundle.tar.gz' into CSV files in the 'out' directory, without
+        extracting the archive.
+
+    sipper --stack cube.npy measure/*
+        Stack all items in the 'measure' directory into a single array
+        in 'cube.npy', indexed by 'cube.index.csv'.
+
+    sipper --reduce mean,std --dark dark.raw8 -o mean.csv measure/*
+        Average the spectra of all items in the 'measure' directory,
+        less the dark frame 'dark.raw8', into 'mean.csv' along with
+        their standard deviation.
+
+    sipper --resample 350:1000:0.5 --stack cube.npy a/* b/*
+        Resample the spectra of two spectrometers in 'a' and 'b' onto
+        one grid from 350 to 1000 nm in steps of 0.5 nm and stack them
+        into a single array in 'cube.npy'.
+
+    sipper --verify -o report.jsonl /archive
+        Check every .raw8 file under '/archive' without converting any,
+        writing a line of JSON per file into 'report.jsonl'.
+
+    sipper --index catalog.sqlite /archive
+    sipper -c -o out --catalog catalog.sqlite --where \
+        "spectrometer_serial = '1102139U1' and
+         mtime > strftime('%s', 'now', '-7 days')"
+        Record the header of every .raw8 file under '/archive' in
+        'catalog.sqlite', then convert those of one spectrometer written
+        within the last week into CSV files in the 'out' directory.
+
+    sipper -j 8 --serve /run/sipper.sock
+    sipper --connect /run/sipper.sock -c -o out measure/file.raw8
+        Keep a warm server on '/run/sipper.sock' running up to 8
+        conversions at once, then have it convert 'file' into CSV in the
+        'out' directory without starting up pandas again.
+
     sipper -i -h -y -c -x -X -o out/ *
         Convert all items (*) in the current working directory into 
         CSV (-c), separate spreadsheets (-x), and coalesced spreadsheet 
@@ -82,6 +202,25 @@ OPTIONS
     -v, --version
         Display version information and exit.
 
+    -j, --jobs
+        Probe, parse and write input files across the given number of
+        worker processes, -j 0 for one per available CPU. At most twice as
+        many inputs as workers are in flight at once, and results are
+        still reported in input order.
+
+    --prefetch
+        Overlap reading, decoding and writing within one process: the
+        given number of threads, e.g. --prefetch 4, read upcoming
+        inputs ahead while the current one is decoded, and outputs are
+        written on a thread of their own. Pays off where latency rather
+        than CPU bounds a conversion, e.g. on network shares. Ignored with
+        -j, whose worker processes overlap on their own, and with --axes,
+        --samples or --wavelength, which read only the selected ranges.
+
+    --prefetch-memory
+        Whole megabytes of input data that --prefetch may hold in memory
+        at once. Defaults to 256.
+
     -avs:s, --avs:samples
         Manually set the number of samples in any input AvaSoft RAW 8
         (AVS84, raw8) files.
@@ -90,6 +229,24 @@ OPTIONS
         Manually set the number of dimensions (axes) in any input
         AvaSoft RAW 8 (AVS84, raw8) files.
 
+    --axes
+        Read only the given comma separated axes, by label (wavelength,
+        y, z) or index (0, 1, 2), in the given order, e.g. --axes y.
+
+    --samples
+        Read only the samples from start up to but excluding stop, given
+        as start:stop, either of which may be left out.
+
+    --wavelength
+        Read only the samples whose wavelength lies within low:high nm,
+        inclusive, either of which may be left out. The wavelength axis
+        is read over the --samples range, if any, to find them.
+
+        Selective reads fetch only the byte ranges picked out of each
+        series, merging adjacent ones, with pread on files where there
+        is one and seeks elsewhere, instead of reading every series in
+        full.
+
     -i, --write-index
         Export a row index column in the resulting output files.
 
@@ -99,6 +256,95 @@ OPTIONS
     -y, --override
         Override any existing files with the new output files.
 
+    --incremental
+        Keep a manifest (.sipper-manifest.json) in the output directory,
+        or next to the inputs without -o, recording the size and modification time of every converted
+        input and the outputs made from it. Inputs that are unchanged
+        since the last incremental run, and whose outputs still exist,
+        are skipped. Outputs recorded in the manifest are replaced
+        without -y. Applies to per-file outputs only, not -X, --stack or
+        --reduce.
+
+    --hash
+        With --incremental, also record a content hash of each input. An
+        input whose modification time changed but whose content did not
+        is then skipped as well.
+
+    --prune
+        With --incremental, remove the outputs of inputs recorded in the
+        manifest that no longer exist, and forget those inputs.
+
+    --watch
+        Watch the given directory and convert every .raw8 file into the
+        per-file formats as soon as it has been written out completely,
+        i.e. once it reaches the depth implied by the sample and axis
+        counts. Uses inotify on Linux and polls the directory elsewhere.
+        Files already complete when watching starts are left alone, and
+        a file is converted again whenever it is rewritten. Combine with
+        -y or --incremental to replace the outputs of rewritten files.
+
+    --watch-interval
+        Seconds between checks for files still being written, or between
+        directory scans when polling. Defaults to 1.
+
+    --poll
+        Poll the watched directory even where inotify is available, e.g.
+        for network shares where inotify sees no remote writes.
+
+    --verify
+        Check instead of converting: read only the header of every .raw8
+        file under the given directories, recursively, in the given
+        archives and among the given files, apply the same recognition
+        criteria as a conversion and compare the file size to the depth
+        at which the series end. Each file is reported as a line of JSON
+        on stdout, or in the -o file, with its status: good, truncated
+        when its series are cut short, unrecognized, or error when it
+        cannot be read, along with its size, the depth at which its
+        series end (series_depth) and its serial. The footer after the
+        series is not checked, as conversions do not read it.
+        A summary goes to stderr, and the exit status is 1 unless every
+        file is good. Files are checked on -j threads, 16 by default.
+
+    --index
+        Record instead of converting: read the header of every .raw8 file
+        under the given directories, in the given archives and among the
+        given files into a table 'files' of the given SQLite catalog, one
+        row per file with its path, size, modification time (mtime, in
+        seconds since the epoch), status as reported by --verify,
+        signature, spectrometer serials, sample and axis counts, header
+        depth, series depth and the hex of the header block at 0x0005
+        (mystery) that varies between files. The catalog is updated
+        incrementally: files whose size and modification time are
+        unchanged are not read again, archives that are unchanged are not
+        opened again, and files that vanished from under the given inputs
+        are forgotten. Headers are read on -j threads, 16 by default.
+
+    --catalog
+        Convert the good files recorded in the given catalog, in path
+        order, in addition to any inputs given.
+
+    --where
+        Convert only those --catalog files for which the given SQL
+        condition over the columns of the 'files' table holds, e.g.
+        "spectrometer_serial = 'X' and size > 50000".
+
+    --serve
+        Serve instead of converting: import pandas, NumPy and every
+        available driver once, then listen on the given Unix domain
+        socket, which only the same user may connect to, and run every
+        request in a process forked from the warm one, -j at a time, one
+        per CPU by default. Runs until interrupted or terminated. Unix
+        only.
+
+    --connect
+        Have the server on the given socket run this invocation instead,
+        with every other option and input as given and relative paths
+        taken from the current directory. Output and reports are relayed
+        as they are written, stdin is forwarded when an input is '-', and
+        the exit status is the server's. Startup then costs no more than
+        connecting to the socket, e.g. when converting each file as it
+        is acquired.
+
     -x, --excel-sheet
         Convert input data into individual Excel workbooks. Each sheet 
         within each output workbook has a name reflecting that of the
@@ -113,6 +359,83 @@ OPTIONS
         Convert input data into individual comma-separated values (CSV)
         files.
 
+    --float-format
+        printf-style format applied to every value in CSV output, e.g.
+        %.6g or %.3f. By default each value is written with the shortest
+        representation that round-trips its single precision float.
+
+    --compress
+        Compress -c, --npy and --reduce outputs with gzip, zstd or xz as
+        they are written, adding the .gz, .zst or .xz suffix to their
+        names, that of an output file given with -o included. Such a
+        file is compressed according to its suffix even without
+        --compress, e.g. -o out.csv.zst. zstd compresses on every core
+        and requires the zstandard package. Parquet, Feather and Excel
+        outputs are compressed internally.
+
+    --parquet
+        Convert input data into individual Apache Parquet files. Columns
+        keep their single precision type and the input header properties
+        (serial, header depth, sample count, ...) are stored as schema
+        metadata. Requires pyarrow.
+
+    --feather
+        Convert input data into individual Feather (Apache Arrow IPC)
+        files, with the same types and metadata as --parquet. Requires
+        pyarrow.
+
+    --npy
+        Convert input data into individual NumPy .npy files holding a
+        single precision samples-by-axes array. The .npy format cannot
+        hold the input header properties.
+
+    --stack
+        Stack the data of every input into the given .npy file as one
+        single precision array of files x axes x samples. The array is
+        filled in through a memory map, so it never has to fit in memory,
+        and can be sliced the same way with numpy.load(mmap_mode='r'). A
+        side table with the '.index.csv' extension maps each row to its
+        input file and header properties.
+
+    --resample
+        Linearly interpolate the series of every input onto a common
+        wavelength grid before writing them, given as start:stop:step in
+        nanometers, stop included when it falls on the grid, or as a
+        reference .raw8 file whose wavelengths are the grid. Samples
+        outside the wavelength range of an input become NaN. Inputs from
+        different spectrometers can then be stacked or reduced together.
+        The interpolation weights are computed once per input grid, so
+        the inputs of one spectrometer are resampled at the cost of a
+        single gather and multiply-add across all of their axes.
+
+    --reduce
+        Compute the given comma separated statistics, any of mean, std,
+        min, max and median, for every wavelength across all inputs and
+        write them into a single table: the wavelengths followed by a
+        column per axis and statistic, e.g. 'y mean'. std is the sample
+        standard deviation. The inputs are reduced as they are decoded,
+        so they never have to fit in memory; median alone spills them
+        into a temporary file. The output is the -o file, .csv, .xlsx,
+        .parquet or .feather, or 'reduce.csv' in the -o directory or the
+        directory of the first input. All inputs must share the
+        wavelengths of the first.
+
+    --dark
+        Subtract the series of the given .raw8 dark frame from those of
+        every input before --reduce computes its statistics.
+
+    --stats
+        Report the time each input spent in every stage (open, header
+        decode, series decode, DataFrame build, write) along with the
+        bytes read and written, then the totals over all inputs, files/s,
+        MB/s read and the peak memory use. A coalesced workbook or stack
+        counts towards the write totals. The first input in each process
+        also bears the cost of importing numpy and pandas.
+
+    --stats-json
+        Save the per-input and total statistics of --stats to the given
+        JSON file, whether or not --stats is given.
+
     --help
         Display the terse manual and exit.
 
@@ -130,6 +453,13 @@ AUTHOR
 """
 
 
+# '-' stands for stdin as an input and stdout as the output
+STDIO = '-'
+
+# a .raw8 file piped in through stdin
+stdin_data = None
+
+
 def strip_extension(file_name):
     split = file_name.split('.')
     if 1 < len(split):
@@ -137,48 +467,171 @@ def strip_extension(file_name):
     return split[0]
 
 
+def input_name(input):
+    if STDIO == input:
+        return 'stdin'
+    from sipper.archive import split
+    archive, member = split(input)
+    return strip_extension(os.path.basename(member or archive))
+
+
+def open_input(input, buffering=-1):
+    if STDIO == input:
+        return io.BytesIO(stdin_data)
+    from sipper.archive import SEPARATOR, open_member
+    if SEPARATOR in input:
+        return open_member(input)
+    return open(input, 'rb', buffering=buffering)
+
+
+def input_buffering(parcel):
+    # selective reads fetch their ranges themselves, so the header should
+    # not pull a buffer's worth of the series along with it
+    from sipper.driver.avs84 import Selection
+    return -1 if Selection.from_parcel(parcel) is None else 0
+
+
+def expand_archives(params):
+    """Replace archives among the inputs by their members, see expand."""
+    from sipper.archive import expand
+
+    expanded = []
+    for input in params:
+        try:
+            expanded.extend(expand(input))
+        except Exception as e:
+            sys.stderr.write(f'error({type(e).__name__}): {e}\n')
+            sys.stderr.write(f'cannot read archive {input}\n')
+    return expanded
+
+
+def no_inputs(parcel, params):
+    """Report that there is nothing to convert, unless watching."""
+    if 0 < len(params) or parcel.watch:
+        return False
+    sys.stderr.write('no input files specified.\n')
+    sys.stderr.write('see: sipper --help\n')
+    return True
+
+
+def input_directory(input):
+    from sipper.archive import container
+    # outputs of archive members go next to the archive
+    return os.path.dirname(container(input))
+
+
+def expand_stdin(parcel, params):
+    """Resolve a '-' among the inputs. stdin either holds a single .raw8
+    file, recognized by its signature, or the paths of the inputs, one per
+    line, e.g. as printed by find."""
+    global stdin_data
+    if STDIO not in params:
+        return params
+
+    head = sys.stdin.buffer.read(5)
+    if b'AVS84' == head:
+        stdin_data = head + sys.stdin.buffer.read()
+        # the data only lives in this process
+        parcel.jobs = 1
+        return params
+
+    try:
+        text = (head + sys.stdin.buffer.read()).decode()
+    except UnicodeDecodeError:
+        raise ValueError('stdin is neither an AVS84 stream nor a list of '
+                         'paths, one per line')
+    paths = [ line for line in text.splitlines() if line.strip() ]
+    expanded = []
+    for input in params:
+        expanded.extend(paths if STDIO == input else [ input ])
+    return expanded
+
+
+def avs84_shape(parcel):
+    # TODO: figure out where sample count and column
+    # count are encoded in the RAW 8 file (maybe an
+    # enum related to the spectrometer serial)
+    samples = 3400
+    dimensions = 3
+
+    # TODO: document command line options
+    if parcel.avs_samples:
+        samples = int(parcel.avs_samples)
+    if parcel.avs_dimensions:
+        dimensions = int(parcel.avs_dimensions)
+
+    samples = max(samples, 0)
+    dimensions = min(max(dimensions, 0), 3)
+    return samples, dimensions
+
+
+def avs84_depth(parcel):
+    # the file depth load_avs84 reaches once every series is read
+    samples, dimensions = avs84_shape(parcel)
+    return 328 + 4 * samples * dimensions
+
+
+def read_avs84_header(parcel, fin, head=b''):
+    from sipper.driver.avs84 import read_header, recognized
+
+    # the whole header, or what `head` leaves of it, is fetched and
+    # decoded with a single read
+    header, header_depth = read_header(fin, head)
+    signature = header['signature']
+    serial = header['spectrometer_serial']
+    confirm_serial = header['spectrometer_serial_confirm']
+
+    samples, dimensions = avs84_shape(parcel)
+
+    properties = {
+        'signature': signature,
+        'spectrometer_serial': serial,
+        'spectrometer_serial_confirm': confirm_serial,
+        'sample_count': samples,
+        'dimension_count': dimensions,
+        'header_depth': header_depth
+    }
+
+    return properties, recognized(header, header_depth)
+
+
+def read_avs84_series(parcel, fin, properties):
+    """Read the series, or those picked by --axes, --samples and
+    --wavelength, and return them along with their labels and the number
+    of bytes read."""
+    from sipper.driver.avs84 import Selection, read_selected_series, read_series
+
+    samples = properties['sample_count']
+    dimensions = properties['dimension_count']
+    labels = [ 'wavelength (nm)', 'y', 'z' ][:dimensions]
+
+    selection = Selection.from_parcel(parcel)
+    if selection is None:
+        series = read_series(fin, samples, dimensions)
+        read = series.nbytes
+    else:
+        series, labels, (start, stop), read = read_selected_series(
+            fin, samples, dimensions, labels, selection)
+        properties['sample_range'] = f'{start}:{stop}'
+
+    file_depth = fin.tell()
+    properties['file_depth'] = file_depth
+    return series, labels, read
+
+
+def avs84_frame(series, labels, properties):
+    import pandas as pd
+
+    # float32 columns viewing the series buffer, nothing is copied
+    data = pd.DataFrame(series.T, columns=labels, copy=False)
+    # header properties travel with the frame for metadata-aware writers
+    data.attrs.update(properties)
+    return data
+
+
 def load_avs84(parcel, path, probe=False):
-    with open(path, 'rb') as fin:
-        # header
-        signature = fin.read(5).decode('ascii')
-        fin.read(9)
-        serial = fin.read(9).decode('ascii')
-        fin.read(1)
-        confirm_serial = fin.read(9).decode('ascii')
-        fin.read(295)
-        header_depth = fin.tell()
-
-        # TODO: figure out where sample count and column
-        # count are encoded in the RAW 8 file (maybe an
-        # enum related to the spectrometer serial)
-        samples = 3400
-        dimensions = 3
-
-        # TODO: document command line options
-        # TODO: read in data
-        if parcel.avs_samples:
-            samples = int(parcel.avs_samples)
-        if parcel.avs_dimensions:
-            dimensions = int(parcel.avs_dimensions)
-
-        samples = max(samples, 0)
-        dimensions = min(max(dimensions, 0), 3)
-
-        properties = {
-            'signature': signature,
-            'spectrometer_serial': serial,
-            'spectrometer_serial_confirm': confirm_serial,
-            'sample_count': samples,
-            'dimension_count': dimensions,
-            'header_depth': header_depth
-        }
-
-        recognized = (
-            'AVS84'        == signature   and
-            9              == len(serial) and
-            confirm_serial == serial      and
-            328            == header_depth
-        )
+    with open_input(path, input_buffering(parcel)) as fin:
+        properties, recognized = read_avs84_header(parcel, fin)
 
         if probe:
             return properties, recognized
@@ -186,167 +639,918 @@ def load_avs84(parcel, path, probe=False):
         if not recognized:
             raise ValueError(f'AVS84 (RAW 8) unrecognized in {path}')
 
-        # 4-byte floating points per axis
-        buffer_size = 4 * samples
-        labels = [ 'wavelength (nm)', 'y', 'z' ]
-        series = []
+        series, labels, _ = read_avs84_series(parcel, fin, properties)
+        return properties, avs84_frame(series, labels, properties)
+
+
+def job_count(parcel):
+    jobs = int(getelse(parcel, 'jobs', 1))
+    # -j 0 uses every available core
+    if 0 == jobs:
+        jobs = os.cpu_count() or 1
+    return max(jobs, 1)
+
+
+def count_option(parcel, name):
+    """Check that the option `name` was given a whole number, if at all,
+    since a value left out would swallow the next argument instead."""
+    value = getattr(parcel, name)
+    if value is None:
+        return True
+    if isinstance(value, str) and value.isdigit():
+        return True
+    label = name.replace('_', '-')
+    given = '' if value is True else f', was {value}'
+    sys.stderr.write(f'error: --{label} requires a number{given}\n')
+    sys.stderr.write(f'use: --{label} <count>, see: sipper --manual\n')
+    return False
+
+
+def format_option(parcel):
+    """Check that --float-format, if given, formats a single float."""
+    value = parcel.float_format
+    if value is None:
+        return True
+    try:
+        if not isinstance(value, str):
+            raise ValueError('--float-format requires a format')
+        value % 1.0
+        return True
+    except (TypeError, ValueError) as e:
+        sys.stderr.write(f'error({type(e).__name__}): {e}\n')
+        sys.stderr.write('use: --float-format with a single printf-style '
+                         'conversion, e.g. %.6g\n')
+        return False
+
+
+def run_ordered(parcel, function, tasks, prepare=None):
+    """Apply `function` to each argument tuple in `tasks`, spreading the
+    calls across a process pool when -j is given, and yield
+    (arguments, result, error) triples in task order. In the pool, each
+    task is submitted with the arguments `prepare(arguments)` returns,
+    computed in this process in task order."""
+    jobs = job_count(parcel)
+    if jobs <= 1:
+        for arguments in tasks:
+            try:
+                yield arguments, function(*arguments), None
+            except Exception as e:
+                yield arguments, None, e
+        return
 
-        for axis in range(dimensions):
-            buffer = fin.read(buffer_size)
-            size = len(buffer)
-            if buffer_size != size:
-                raise ValueError(
-                    f'buffer size expected {buffer_size}, but was {size} on axis {axis}')
-            series.append(struct.unpack(f'<{samples}f', buffer))
+    from collections import deque
+    from concurrent.futures import Future, ProcessPoolExecutor
+    from itertools import islice
+
+    # only a couple of tasks per worker are in flight, so that the results
+    # held at once, frames kept for coalesced outputs among them, stay
+    # bounded however many inputs there are
+    prepare = prepare or (lambda arguments: arguments)
+    tasks = iter(tasks)
+    with ProcessPoolExecutor(jobs) as executor:
+        def submit(arguments):
+            try:
+                future = executor.submit(function, *prepare(arguments))
+            except Exception as e:
+                future = Future()
+                future.set_exception(e)
+            return arguments, future
+
+        futures = deque(map(submit, islice(tasks, 2 * jobs)))
+        while futures:
+            arguments, future = futures.popleft()
+            futures.extend(map(submit, islice(tasks, 1)))
+            try:
+                result, error = future.result(), None
+            except Exception as e:
+                result, error = None, e
+            # the deque no longer holds the future, nor will this frame
+            future = None
+            yield arguments, result, error
+            result = None
+
+
+def output_size(output):
+    if STDIO == output or not os.path.exists(output):
+        return 0
+    return os.path.getsize(output)
+
+
+def resample_grid(parcel):
+    from sipper.resample import grid
+    # the grid is every wavelength of the reference, whatever is selected
+    whole = Parcel(**dict(iter(parcel)))
+    whole.axes = whole.samples = whole.wavelength = None
+    return grid(parcel.resample,
+        lambda path: load_avs84(whole, path)[1].iloc[:, 0].to_numpy())
+
+
+def resample_frame(parcel, data):
+    """Resample a frame onto the --resample grid, if any."""
+    if not parcel.resample:
+        return data
+
+    import pandas as pd
+    from sipper.resample import resample
+
+    series = resample(data.to_numpy(), resample_grid(parcel))
+    resampled = pd.DataFrame(series, columns=data.columns, copy=False)
+    resampled.attrs.update(data.attrs)
+    resampled.attrs['sample_count'] = len(series)
+    return resampled
+
+
+def decode_avs84(parcel, fin, stats, head=b''):
+    """Probe and decode the AVS84 file in `fin` in a single pass, after the
+    `head` already read from it. Returns its properties and frame, or no
+    frame if it was not recognized."""
+    with stats.stage('header'):
+        properties, recognized = read_avs84_header(parcel, fin, head)
+    if not recognized:
+        stats.bytes_read = fin.tell()
+        return properties, None
+    with stats.stage('series'):
+        series, labels, read = read_avs84_series(parcel, fin, properties)
+    stats.bytes_read = properties['header_depth'] + read
+    with stats.stage('frame'):
+        data = resample_frame(parcel, avs84_frame(series, labels, properties))
+    return properties, data
+
+
+# driver name: decode(parcel, fin, stats, head), for the drivers whose
+# files can be converted
+decoders = {
+    'avs84': decode_avs84
+}
+
+
+def decode_input(parcel, fin, stats):
+    """Read the first bytes of the input in `fin`, pick its decoder by the
+    driver signature they carry and hand them on to it, so that inputs of
+    mixed formats are routed without probing each with every driver.
+    Returns the properties and frame, no frame if the driver did not
+    recognize the input, and neither if no driver did."""
+    from sipper.driver import detect, head_size
+
+    with stats.stage('header'):
+        head = fin.read(head_size())
+    decoder = decoders.get(detect(head))
+    if decoder is None:
+        stats.bytes_read = len(head)
+        return {}, None
+    return decoder(parcel, fin, stats, head)
+
+
+def write_outputs(parcel, data, outputs, stats):
+    """Hand `data` to each (output, name, callback) in `outputs` and
+    return an (output, error) pair for each."""
+    written = []
+    for output, name, callback in outputs:
+        try:
+            with stats.stage('write'):
+                callback(parcel, data, output, name)
+            written.append((output, None))
+            stats.bytes_written += output_size(output)
+        except Exception as e:
+            written.append((output, e))
+    return written
 
-        file_depth = fin.tell()
-        properties['file_depth'] = file_depth
 
-        return properties, pd.DataFrame({ l: s for l, s in zip(labels, series) })
+def convert_input(parcel, input, outputs, keep, buffer=None):
+    """Probe and decode `input` in a single pass and hand the frame to
+    each (output, name, callback) in `outputs`. The frame itself is only
+    returned when `keep` is set, e.g. for the coalesced workbook. The time
+    spent in each stage is returned along with it as Stats. The contents
+    of `input` may be handed over as a `buffer` read beforehand."""
+    from sipper.stats import Stats
 
+    stats = Stats()
+    with stats.stage('open'):
+        if buffer is not None:
+            fin = io.BytesIO(buffer)
+        else:
+            fin = open_input(input, input_buffering(parcel))
+    with fin:
+        properties, data = decode_input(parcel, fin, stats)
+    if data is None:
+        return properties, False, [], None, stats
 
-def probe_avs84_only(parcel, files):
-    avs84_inputs = []
-    for input in files:
-        try:
-            _, recognized = load_avs84(parcel, input, probe=True)
-            if recognized:
-                avs84_inputs.append(input)
-            else:
-                print(f'warn: {input} not an AVS84 file')
-        except Exception as e:
-            sys.stderr.write(f'error({type(e).__name__}): {e}\n')
-    return avs84_inputs
+    written = write_outputs(parcel, data, outputs, stats)
+    return properties, True, written, data if keep else None, stats
 
 
-def do_injective_mapping(parcel, params, extension, callback):
-    # probe input files for AVS84
-    avs84_inputs = probe_avs84_only(parcel, params)
-    if 0 == len(avs84_inputs):
-        sys.stderr.write(
-            f'critical: no input files passed AVS84 probe check.\n')
-        return
+def prefetch_avs84(arguments):
+    """Read as much of an input as decoding it takes, on a reader thread.
+    The time spent is accounted as its open stage."""
+    from sipper.stats import Stats
 
-    # convert
-    multiple_inputs = 1 < len(avs84_inputs)
-    for input in avs84_inputs:
-        name = strip_extension(os.path.basename(input))
-        output = parcel.output
-        if output is None:
-            output = os.path.dirname(input)
+    parcel, input, _, _ = arguments
+    stats = Stats()
+    with stats.stage('open'):
+        with open_input(input) as fin:
+            buffer = fin.read(avs84_depth(parcel))
+    return buffer, stats
 
-        if 0 == len(output):
-            output = os.getcwd()
 
-        parent = os.path.dirname(output)
-        try:
-            if 0 < len(parent) and not os.path.exists(parent):
-                os.makedirs(parent)
-            if (not os.path.exists(output) or 
-                not os.path.isdir(output)) and multiple_inputs:
-                os.makedirs(output)
-        except Exception as e:
-            sys.stderr.write(f'fatal({type(e).__name__}): {e}\n')
-            sys.stderr.write('cannot create output directory\n')
-            break
+def decode_prefetched(arguments, prefetched):
+    parcel, _, _, _ = arguments
+    buffer, stats = prefetched
+    properties, data = decode_input(parcel, io.BytesIO(buffer), stats)
+    # the reader fetched the whole buffer, whatever was decoded from it
+    stats.bytes_read = len(buffer)
+    return properties, data, stats
 
-        if os.path.isdir(output):
-            output = os.path.join(
-                output, strip_extension(name) + '.' + extension)
 
-        if os.path.exists(output) and not parcel.override:
-            sys.stderr.write(
-                f'error: {output} already exists, aborting conversion of {input}\n')
-            sys.stderr.write('use: -y to override existing files\n')
-            continue
+def write_decoded(arguments, decoded):
+    parcel, _, outputs, keep = arguments
+    properties, data, stats = decoded
+    if data is None:
+        return properties, False, [], None, stats
 
-        try:
-            properties, data = load_avs84(parcel, input)
-            callback(data, output, name)
-            print(f'{input} -> {output}')
-            for k, v in properties.items():
-                print(f'\t{k}: {v}')
-        except Exception as e:
-            sys.stderr.write(f'error({type(e).__name__}): {e}\n')
-            continue
+    written = write_outputs(parcel, data, outputs, stats)
+    return properties, True, written, data if keep else None, stats
 
 
-def do_excel_sheet(parcel, params):
-    do_injective_mapping(parcel, params, 'xlsx',
-        lambda data, file, srcname: pd.DataFrame.to_excel(data, file,
-            index=getelse(parcel, 'write_index', False),
-            header=getelse(parcel, 'write_header', False),
-            sheet_name=srcname
-        )
-    )
-
-def do_csv(parcel, params):
-    do_injective_mapping(parcel, params, 'csv',
-        lambda data, file, _: pd.DataFrame.to_csv(data, file,
-            index=getelse(parcel, 'write_index', False),
-            header=getelse(parcel, 'write_header', False),
-        )
-    )
-
-def do_excel_book(parcel, params):
-    # probe input files for AVS84
-    avs84_inputs = probe_avs84_only(parcel, params)
-    if 0 == len(avs84_inputs):
-        sys.stderr.write(
-            f'critical: no input files passed AVS84 probe check.\n')
-        return
+def run_pipelined(parcel, tasks):
+    """Like run_ordered with convert_input, but reading the upcoming inputs
+    ahead on --prefetch threads and writing on a thread of its own, under
+    a cap of --prefetch-memory megabytes of inputs held in memory."""
+    from sipper.pipeline import pipeline
+
+    readers = int(parcel.prefetch)
+    capacity = float(getelse(parcel, 'prefetch_memory', 256)) * (1 << 20)
+    depth = avs84_depth(parcel)
+
+    return pipeline(tasks, prefetch_avs84, decode_prefetched, write_decoded,
+        cost=lambda _: depth, readers=readers,
+        capacity=capacity)
+
 
+def resolve_output(parcel, input, extension, multiple_inputs):
     output = parcel.output
+    if STDIO == output:
+        return output
     if output is None:
-        output = os.path.dirname(avs84_inputs[0])
+        output = input_directory(input)
 
     if 0 == len(output):
         output = os.getcwd()
 
+    parent = os.path.dirname(output)
+    if 0 < len(parent) and not os.path.exists(parent):
+        os.makedirs(parent)
+    if (not os.path.exists(output) or 
+        not os.path.isdir(output)) and multiple_inputs:
+        os.makedirs(output)
+
+    if os.path.isdir(output):
+        name = input_name(input)
+        output = os.path.join(
+            output, strip_extension(name) + '.' + extension)
+    else:
+        # a file named by -o is compressed as --compress asks too
+        from sipper.compress import inferred, with_suffix
+        output = with_suffix(output, inferred(extension))
+
+    return output
+
+
+def prepare_output(parcel, output):
+    """Create the directory of the single `output` file, and refuse to
+    replace an existing one without -y. Returns the output, or None."""
     parent = os.path.dirname(output)
     try:
         if 0 < len(parent) and not os.path.exists(parent):
             os.makedirs(parent)
     except Exception as e:
-        sys.stderr.write(f'fatal({type(e).__name__}): {e}')
-        sys.stderr.write('cannot create output directory')
-        return
-    
-    if os.path.isdir(output):
-        output = os.path.join(output, 'out.xlsx')
-        print(f'warn: output file not specified, using {output}')
+        sys.stderr.write(f'fatal({type(e).__name__}): {e}\n')
+        sys.stderr.write('cannot create output directory\n')
+        return None
 
     if os.path.exists(output) and not parcel.override:
         sys.stderr.write(
             f'error: {output} already exists, aborting conversion process\n')
         sys.stderr.write('use: -y to override existing files\n')
+        return None
+
+    return output
+
+
+def resolve_book_output(parcel, input):
+    output = parcel.output
+    if output is None:
+        output = input_directory(input)
+
+    if 0 == len(output):
+        output = os.getcwd()
+
+    if os.path.isdir(output):
+        output = os.path.join(output, 'out.xlsx')
+        print(f'warn: output file not specified, using {output}')
+
+    return prepare_output(parcel, output)
+
+
+def write_with_driver(driver, mode, parcel, data, file, srcname):
+    from sipper.compress import compressed, inferred
+
+    frames = [ Data(srcname, DataType.FRAME, data) ]
+    compression = parcel.compress if STDIO == file else inferred(file)
+    if STDIO == file:
+        # sys.stdout may have been pointed at stderr for the reports
+        if compression is None:
+            find_driver(driver).write(parcel, frames, sys.__stdout__)
+        else:
+            sys.__stdout__.flush()
+            with compressed(sys.__stdout__.buffer, compression,
+                            'b' not in mode) as fout:
+                find_driver(driver).write(parcel, frames, fout)
+        sys.__stdout__.flush()
+        return
+    if compression is None:
+        with open(file, mode) as fout:
+            find_driver(driver).write(parcel, frames, fout)
         return
+    with open(file, 'wb') as raw:
+        with compressed(raw, compression, 'b' not in mode) as fout:
+            find_driver(driver).write(parcel, frames, fout)
+
+def write_excel_book(parcel, frames, file):
+    # the coalesced workbook has column labels unless told otherwise
+    parcel = Parcel(**dict(iter(parcel)))
+    parcel.write_header = getelse(parcel, 'write_header', True)
+
+    # only create the workbook once there is something to put in it
+    first = next(frames, None)
+    if first is None:
+        return
+    fout = open(file, 'wb')
+    try:
+        with fout:
+            find_driver('excel').write(parcel, chain([ first ], frames), fout)
+    except BaseException:
+        # a workbook cut short is no workbook at all
+        os.remove(file)
+        raise
+
+
+def resolve_stack_output(parcel):
+    output = parcel.stack
+    if not isinstance(output, str):
+        sys.stderr.write('error: --stack requires an output file\n')
+        return None
+
+    if 'npy' != output.split('.')[-1].lower():
+        sys.stderr.write(f'error: {output} is not a supported stack format\n')
+        sys.stderr.write('use: a .npy output file\n')
+        return None
+
+    return prepare_output(parcel, output)
+
+
+# extension of the --reduce output: (driver, mode)
+reduce_formats = {
+    'csv': ('csv', 'w'),
+    'xlsx': ('excel', 'wb'),
+    'parquet': ('parquet', 'wb'),
+    'feather': ('feather', 'wb')
+}
+
+
+def resolve_reduce_output(parcel, input):
+    output = parcel.output
+    if output is None:
+        output = input_directory(input)
+
+    if 0 == len(output):
+        output = os.getcwd()
+
+    from sipper.compress import strip_suffix, with_suffix
+    if os.path.isdir(output) or output.endswith(os.sep):
+        output = with_suffix(os.path.join(output, 'reduce.csv'),
+                             parcel.compress)
+    else:
+        format = strip_suffix(output).split('.')[-1].lower()
+        if format not in reduce_formats:
+            sys.stderr.write(f'error: {output} is not a supported reduce format\n')
+            sys.stderr.write(
+                f'use: a .{", .".join(reduce_formats)} output file or a directory\n')
+            return None
+        if 'csv' == format:
+            output = with_suffix(output, parcel.compress)
+
+    return prepare_output(parcel, output)
+
+
+def load_dark(parcel):
+    try:
+        _, dark = load_avs84(parcel, parcel.dark)
+        return resample_frame(parcel, dark)
+    except Exception as e:
+        sys.stderr.write(f'error({type(e).__name__}): {e}\n')
+        sys.stderr.write(f'cannot read dark frame {parcel.dark}\n')
+        return None
+
+
+def write_reduce(parcel, reduce, output):
+    data = reduce.result()
+    if data is None:
+        return
+    # the statistics are told apart by their column labels
+    parcel = Parcel(**dict(iter(parcel)))
+    parcel.write_header = getelse(parcel, 'write_header', True)
+
+    from sipper.compress import strip_suffix
+    driver, mode = reduce_formats[strip_suffix(output).split('.')[-1].lower()]
+    write_with_driver(driver, mode, parcel, data, output, 'reduce')
+    print(f'reduced {reduce.count} input(s) -> {output}')
+
 
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        for input in avs84_inputs:
-            name = strip_extension(os.path.basename(input))
+def manifest_directory(parcel, multiple_inputs, input):
+    """The directory receiving the outputs of `input`, which keeps the
+    manifest recording it."""
+    output = parcel.output
+    if output is None:
+        return input_directory(input) or os.getcwd()
+    if multiple_inputs or os.path.isdir(output):
+        return output
+    return os.path.dirname(output) or os.getcwd()
+
+
+def prune_outputs(manifest):
+    for source, outputs in manifest.prune():
+        for output in outputs:
             try:
-                properties, data = load_avs84(parcel, input)
-                data.to_excel(writer, 
-                    index=getelse(parcel, 'write_index', False),
-                    header=getelse(parcel, 'write_header', True),
-                    sheet_name=name
-                )
-                print(f'{input} -> {output}')
-                for k, v in properties.items():
-                    print(f'\t{k}: {v}')
+                if os.path.exists(output):
+                    os.remove(output)
+                print(f'pruned {output} ({source} is gone)')
             except Exception as e:
                 sys.stderr.write(f'error({type(e).__name__}): {e}\n')
+
+
+def stack_frames(stack, records, stats):
+    for input, frame, written in records:
+        try:
+            with stats.stage('write'):
+                stack.append(input, frame.object)
+            written.append((stack.path, None))
+        except Exception as e:
+            written.append((stack.path, e))
+        yield input, frame, written
+
+
+def reduce_frames(reduce, output, records, stats):
+    for input, frame, written in records:
+        try:
+            with stats.stage('write'):
+                reduce.append(frame.object)
+            written.append((output, None))
+        except Exception as e:
+            written.append((output, e))
+        yield input, frame, written
+
+
+def book_frames(book, records, failure):
+    """Pass the records on to the workbook, adding it to the outputs of
+    every input whose frame it took, or, once it failed, the error in
+    `failure` to the outputs of that input and every one after it."""
+    for input, frame, written in records:
+        if failure:
+            written.append((book, failure[0]))
+            yield input, frame, written
+            continue
+        yield input, frame, written
+        # asked for the next record, or drained after failing
+        written.append((book, failure[0] if failure else None))
+
+
+def preload_member(arguments):
+    """Read a member of a compressed tar archive here rather than in a
+    worker, which would have to decompress the archive again from its
+    start. The members are read in one pass over the archive this way."""
+    from sipper.archive import is_streamed
+
+    _, input, _, _ = arguments
+    if not is_streamed(input):
+        return arguments
+    with open_input(input) as fin:
+        return arguments + (fin.read(),)
+
+
+def convert_inputs(parcel, tasks, manifest=None, report=None):
+    """Run the conversion `tasks` and report their results in input order.
+    Frames kept for coalesced outputs are yielded as (input, Data, written)
+    records; consumers add their own (output, error) to `written`, and
+    everything is reported once the next record is asked for. Inputs whose
+    outputs were all written are recorded in the `manifest`, if any, and
+    the stats of every converted input are added to the `report`."""
+    from sipper.driver.avs84 import Selection
+
+    recognized_any = False
+    # a selection reads ranges picked from the series as it goes, which
+    # reading ahead in full would defeat
+    if (0 < int(getelse(parcel, 'prefetch', 0)) and job_count(parcel) <= 1
+        and Selection.from_parcel(parcel) is None):
+        results = run_pipelined(parcel, tasks)
+    else:
+        results = run_ordered(parcel, convert_input, tasks, preload_member)
+
+    for arguments, result, e in results:
+        _, input, _, _ = arguments
+        if e is not None:
+            sys.stderr.write(f'error({type(e).__name__}): {e}\n')
+            continue
+
+        properties, recognized, written, data, stats = result
+        if not recognized:
+            print(f'warn: {input} not recognized by any driver')
+            continue
+        recognized_any = True
+        if report is not None:
+            report.add(input, stats)
+
+        if data is not None:
+            name = input_name(input)
+            yield input, Data(name, DataType.FRAME, data), written
+
+        for output, e in written:
+            if e is not None:
+                sys.stderr.write(f'error({type(e).__name__}): {e}\n')
+            else:
+                print(f'{input} -> {output}')
+        if any(e is None for _, e in written):
+            for k, v in properties.items():
+                print(f'\t{k}: {v}')
+            if parcel.stats:
+                print(f'\tstats: {stats}')
+        if manifest is not None and all(e is None for _, e in written):
+            manifest.record(input, [ output for output, _ in written ])
+
+    # inputs skipped by an incremental run passed on an earlier one
+    if (0 < len(tasks) and not recognized_any and
+        (manifest is None or 0 == len(manifest.entries))):
+        sys.stderr.write(
+            'critical: no input file was recognized by any driver.\n')
+
+
+def do_conversion(parcel, params, formats, excel_book, stack=None,
+                  reduce=None):
+    """Convert every input into each of the per-file `formats`, given as
+    (extension, callback) pairs, and optionally into one coalesced
+    workbook, one stacked cube and one table of the `reduce` statistics.
+    Each input is opened and decoded exactly once."""
+    # resolve outputs up front so that conversions may run in parallel
+    multiple_inputs = 1 < len(params)
+    # the per-file outputs of several inputs go into the -o directory, and
+    # the coalesced outputs are resolved against it as well
+    if (0 < len(formats) and multiple_inputs and
+        parcel.output is not None and STDIO != parcel.output):
+        try:
+            os.makedirs(parcel.output, exist_ok=True)
+        except Exception as e:
+            sys.stderr.write(f'fatal({type(e).__name__}): {e}\n')
+            sys.stderr.write('cannot create output directory\n')
+            return
+    book = None
+    if excel_book:
+        book = resolve_book_output(parcel, params[0])
+    if stack is not None:
+        stack = resolve_stack_output(parcel)
+    reduced = None
+    dark = None
+    if reduce is not None:
+        reduced = resolve_reduce_output(parcel, params[0])
+        if reduced is not None and reduced == book:
+            sys.stderr.write(f'error: -X and --reduce both write {book}\n')
+            sys.stderr.write('use: -o with a directory\n')
+            return
+        if reduced is not None and parcel.dark:
+            dark = load_dark(parcel)
+            if dark is None:
+                return
+    if (book is None and stack is None and reduced is None and
+        0 == len(formats)):
+        return
+    keep = book is not None or stack is not None or reduced is not None
+
+    report = None
+    if parcel.stats or parcel.stats_json:
+        from sipper.stats import Report
+        report = Report()
+
+    manifest = None
+    if parcel.incremental:
+        if keep:
+            sys.stderr.write(
+                'error: --incremental only applies to per-file outputs\n')
+            return
+        from sipper.manifest import Manifests
+        manifest = Manifests(
+            partial(manifest_directory, parcel, multiple_inputs),
+            hash=getelse(parcel, 'hash', False))
+
+    planned = set()
+    tasks = []
+    skipped = 0
+    for input in params:
+        name = input_name(input)
+        outputs = []
+        for extension, callback in formats:
+            try:
+                output = resolve_output(
+                    parcel, input, extension, multiple_inputs)
+            except Exception as e:
+                sys.stderr.write(f'fatal({type(e).__name__}): {e}\n')
+                sys.stderr.write('cannot create output directory\n')
+                return
+
+            # outputs recorded in the manifest were produced by an earlier
+            # incremental run from this very input and are ours to replace
+            owned = manifest is not None and manifest.owns(input, output)
+            if STDIO == output:
+                # records on stdout are told apart by their input path
+                outputs.append((output, input, callback))
                 continue
+            if ((output in planned or os.path.exists(output)) and
+                not parcel.override and not owned):
+                sys.stderr.write(
+                    f'error: {output} already exists, aborting conversion of {input}\n')
+                sys.stderr.write('use: -y to override existing files\n')
+                continue
+
+            planned.add(output)
+            outputs.append((output, name, callback))
+
+        if manifest is not None and 0 < len(outputs) and \
+           not manifest.changed(input, [ o for o, _, _ in outputs ]):
+            skipped += 1
+            continue
+
+        if 0 < len(outputs) or keep:
+            tasks.append((parcel, input, outputs, keep))
+
+    if manifest is not None:
+        if 0 < skipped:
+            print(f'{skipped} input(s) up to date, skipped')
+        if parcel.prune:
+            prune_outputs(manifest)
+
+    # convert, streaming frames into the coalesced outputs if any
+    from sipper.stats import Stats, excluding
+    records = convert_inputs(parcel, tasks, manifest, report)
+    stack_stats = Stats()
+    if stack is not None:
+        from sipper.stack import Stack
+        stack = Stack(stack, len(tasks))
+        records = stack_frames(stack, records, stack_stats)
+
+    reduce_stats = Stats()
+    if reduced is not None:
+        from sipper.reduce import Reduce
+        reduce = Reduce(reduce, len(tasks), dark)
+        records = reduce_frames(reduce, reduced, records, reduce_stats)
+
+    book_stats = Stats()
+    try:
+        if book is not None:
+            failure = []
+            records = book_frames(book, records, failure)
+            try:
+                # the workbook pulls the conversions along, which are
+                # accounted for separately
+                with book_stats.stage('write'):
+                    write_excel_book(parcel, excluding(book_stats, 'write',
+                        (frame for _, frame, _ in records)), book)
+            except Exception as e:
+                failure.append(e)
+                sys.stderr.write(f'error({type(e).__name__}): {e}\n')
+                sys.stderr.write(f'cannot write {book}\n')
+
+        # finish any outputs left behind
+        for _ in records:
+            pass
+    finally:
+        if stack is not None:
+            with stack_stats.stage('write'):
+                stack.close()
+        if reduced is not None:
+            try:
+                with reduce_stats.stage('write'):
+                    write_reduce(parcel, reduce, reduced)
+            except Exception as e:
+                sys.stderr.write(f'error({type(e).__name__}): {e}\n')
+                sys.stderr.write(f'cannot write {reduced}\n')
+            finally:
+                reduce.close()
+        if manifest is not None:
+            manifest.save()
+
+    if report is not None:
+        for output, stats in [ (book, book_stats), (stack, stack_stats),
+                               (reduced, reduce_stats) ]:
+            if output is not None:
+                stats.bytes_written = output_size(getattr(output, 'path', output))
+                report.coalesced.add(stats)
+        if parcel.stats:
+            report.print()
+        if parcel.stats_json:
+            try:
+                report.save(parcel.stats_json)
+            except Exception as e:
+                sys.stderr.write(f'error({type(e).__name__}): {e}\n')
+                sys.stderr.write(f'cannot write {parcel.stats_json}\n')
+
+
+def do_verify(parcel, params):
+    """Check every .raw8 file under the given directories, archives and
+    files and report each as a line of JSON, followed by a summary."""
+    import json
+    from sipper.verify import verify
+
+    # a thread per file in flight, as checking is bound by latency
+    threads = job_count(parcel) if parcel.jobs else 16
+    fout = sys.stdout
+    if parcel.output is not None and STDIO != parcel.output:
+        if os.path.exists(parcel.output) and not parcel.override:
+            sys.stderr.write(
+                f'error: {parcel.output} already exists, aborting verification\n')
+            sys.stderr.write('use: -y to override existing files\n')
+            return 1
+        fout = open(parcel.output, 'w')
+
+    counts = dict.fromkeys([ 'good', 'truncated', 'unrecognized', 'error' ], 0)
+    try:
+        for record in verify(params, avs84_depth(parcel), threads):
+            counts[record['status']] += 1
+            fout.write(json.dumps(record) + '\n')
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if fout is not sys.stdout:
+            fout.close()
+
+    sys.stderr.write(f'verified {sum(counts.values())} file(s): ' +
+        ', '.join(f'{count} {status}' for status, count in counts.items()) + '\n')
+    return 0 if counts['good'] == sum(counts.values()) else 1
+
+
+def do_index(parcel, params):
+    """Record the header of every .raw8 file under the given directories,
+    archives and files in the catalog, reading only new or changed ones."""
+    from sipper.catalog import Catalog
+
+    if not isinstance(parcel.index, str):
+        sys.stderr.write('error: --index requires an SQLite catalog\n')
+        return 1
+
+    # a thread per file in flight, as indexing is bound by latency
+    threads = job_count(parcel) if parcel.jobs else 16
+    try:
+        with Catalog(parcel.index) as catalog:
+            counts, errors = catalog.index(params, avs84_shape(parcel), threads)
+    except KeyboardInterrupt:
+        return 1
+    except Exception as e:
+        sys.stderr.write(f'fatal({type(e).__name__}): {e}\n')
+        sys.stderr.write(f'cannot update catalog {parcel.index}\n')
+        return 1
+
+    for error in errors:
+        sys.stderr.write(f'error: {error["path"]}: {error["error"]}\n')
+    print(f'{parcel.index}: ' +
+          ', '.join(f'{count} {state}' for state, count in counts.items()) +
+          (f', {len(errors)} unreadable' if errors else ''))
+    return 0 if not errors else 1
+
+
+# imported by --serve before forking, so that requests start off warm
+served_modules = [
+    'numpy', 'pandas', 'openpyxl', 'pyarrow', 'json',
+    'concurrent.futures', 'sipper.archive', 'sipper.catalog',
+    'sipper.compress', 'sipper.manifest', 'sipper.pipeline',
+    'sipper.reduce', 'sipper.resample', 'sipper.stack', 'sipper.stats',
+    'sipper.verify'
+]
+
+
+def do_serve(parcel):
+    from importlib import import_module
+    from sipper.driver import drivers, load_driver
+    from sipper.serve import serve, supported
+
+    if not supported():
+        sys.stderr.write('error: --serve requires Unix domain sockets and fork\n')
+        return 1
+    if not isinstance(parcel.serve, str):
+        sys.stderr.write('error: --serve requires a socket path\n')
+        return 1
+
+    # optional dependencies are left out where they are not installed
+    for module in served_modules:
+        try:
+            import_module(module)
+        except ImportError:
+            pass
+    for _, _, module, cls, _ in drivers:
+        try:
+            load_driver(module, cls)
+        except ImportError:
+            pass
+
+    jobs = job_count(parcel) if parcel.jobs else os.cpu_count() or 1
+    def ready():
+        print(f'serving on {parcel.serve} with {jobs} job(s), interrupt to stop')
+        sys.stdout.flush()
+
+    try:
+        serve(parcel.serve, jobs, main, ready)
+    except KeyboardInterrupt:
+        pass
+    except Exception as e:
+        sys.stderr.write(f'fatal({type(e).__name__}): {e}\n')
+        sys.stderr.write(f'cannot serve on {parcel.serve}\n')
+        return 1
+    return 0
+
+
+def do_connect(parcel):
+    from sipper.serve import connect, supported
+
+    if not supported() or not isinstance(parcel.connect, str):
+        sys.stderr.write('error: --connect requires a Unix domain socket path\n')
+        return 1
+
+    # everything but --connect itself is forwarded as it was given
+    argv = []
+    args = iter(sys.argv[1:])
+    for arg in args:
+        if '--connect' == arg:
+            next(args, None)
+        elif not arg.startswith('--connect='):
+            argv.append(arg)
+
+    try:
+        return connect(parcel.connect, argv, stdin=STDIO in argv)
+    except KeyboardInterrupt:
+        return 130
+    except BrokenPipeError:
+        # the reader of stdout went away, e.g. head, nothing to report
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        return 1
+    except Exception as e:
+        sys.stderr.write(f'error({type(e).__name__}): {e}\n')
+        sys.stderr.write(f'use: sipper --serve {parcel.connect}\n')
+        return 1
+
+
+def do_watch(parcel, formats):
+    from sipper.watch import watch
+
+    directory = parcel.watch
+    if not isinstance(directory, str) or not os.path.isdir(directory):
+        sys.stderr.write('error: --watch requires a directory\n')
+        return
+
+    # every conversion writes into the same output directory
+    if parcel.output is not None:
+        try:
+            os.makedirs(parcel.output, exist_ok=True)
+        except Exception as e:
+            sys.stderr.write(f'fatal({type(e).__name__}): {e}\n')
+            sys.stderr.write('cannot create output directory\n')
+            return
+
+    depth = avs84_depth(parcel)
+    interval = float(getelse(parcel, 'watch_interval', 1.0))
+    batches = watch(directory,
+        accept=lambda name: name.lower().endswith('.raw8'),
+        complete=lambda path: depth <= os.path.getsize(path),
+        interval=interval, poll=getelse(parcel, 'poll', False))
+
+    print(f'watching {directory} for .raw8 files, interrupt to stop')
+    sys.stdout.flush()
+    try:
+        for paths in batches:
+            do_conversion(parcel, paths, formats, False)
+            sys.stdout.flush()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        batches.close()
 
 
 def main():
     parcel, params = getopt(sys.argv[1:], [
         Switch('v'    , 'version'       ),
         Option('o'    , 'output'        ),
+        Option('j'    , 'jobs'          ),
 
         Option('avs:s', 'avs:samples'   ),
         Option('avs:d', 'avs:dimensions'),
+        Option(long='axes'),
+        Option(long='samples'),
+        Option(long='wavelength'),
 
         Switch('i'    , 'write-index'   ),
         Switch('h'    , 'write-header'  ),
@@ -355,11 +1559,45 @@ def main():
         Switch('x'    , 'excel-sheet'   ),
         Switch('X'    , 'excel-book'    ),
         Switch('c'    , 'csv'           ),
+        Option(long='float-format'),
+        Option(long='compress'),
+        Switch(long='parquet'),
+        Switch(long='feather'),
+        Switch(long='npy'),
+        Option(long='stack'),
+        Option(long='resample'),
+        Option(long='reduce'),
+        Option(long='dark'),
+
+        Switch(long='incremental'),
+        Switch(long='hash'),
+        Switch(long='prune'),
+
+        Option(long='prefetch'),
+        Option(long='prefetch-memory'),
+
+        Switch(long='stats'),
+        Option(long='stats-json'),
+
+        Switch(long='verify'),
+        Option(long='index'),
+        Option(long='catalog'),
+        Option(long='where'),
+
+        Option(long='serve'),
+        Option(long='connect'),
+
+        Option(long='watch'),
+        Option(long='watch-interval'),
+        Switch(long='poll'),
 
         Switch(long='help'),
         Switch(long='manual')
     ])
 
+    if parcel.connect:
+        sys.exit(do_connect(parcel))
+
     # dry runs
     if parcel.version:
         print(__version__)
@@ -373,29 +1611,169 @@ def main():
         print(manual)
         return
 
-    # initial checks
-    if 0 == len(params):
-        sys.stderr.write('no input files specified.\n')
-        sys.stderr.write('see: sipper --help\n')
+    for name in [ 'jobs', 'prefetch', 'prefetch_memory' ]:
+        if not count_option(parcel, name):
+            return
+    if not format_option(parcel):
+        return
+
+    if parcel.serve:
+        sys.exit(do_serve(parcel))
+
+    if parcel.where and not parcel.catalog:
+        sys.stderr.write('error: --where only applies to --catalog\n')
+        return
+
+    if parcel.catalog:
+        from sipper.catalog import select
+        try:
+            if not isinstance(parcel.catalog, str):
+                raise ValueError('--catalog requires an SQLite catalog')
+            if parcel.where is not None and not isinstance(parcel.where, str):
+                raise ValueError('--where requires an SQL condition')
+            params = params + select(parcel.catalog, parcel.where)
+        except Exception as e:
+            sys.stderr.write(f'error({type(e).__name__}): {e}\n')
+            sys.stderr.write('see: sipper --manual\n')
+            return
+
+    # streaming through stdin and stdout
+    streamed = params == [ STDIO ]
+    try:
+        params = expand_stdin(parcel, params)
+    except ValueError as e:
+        sys.stderr.write(f'error: {e}\n')
+        sys.stderr.write('see: sipper --manual\n')
+        return
+
+    # initial checks, once stdin has named its inputs
+    if no_inputs(parcel, params):
+        return
+
+    if parcel.verify:
+        sys.exit(do_verify(parcel, params))
+
+    if parcel.index:
+        sys.exit(do_index(parcel, params))
+
+    if streamed and parcel.output is None:
+        parcel.output = STDIO
+    # archives and patterns may hold no inputs at all
+    params = expand_archives(params)
+    if no_inputs(parcel, params):
         return
 
+    if STDIO == parcel.output:
+        if (not parcel.csv or parcel.excel_sheet or parcel.excel_book or
+            parcel.parquet or parcel.feather or parcel.npy or
+            parcel.stack or parcel.reduce or parcel.incremental or
+            parcel.watch):
+            sys.stderr.write('error: only CSV output can be written to stdout\n')
+            return
+        # the data goes to stdout, so the reports go to stderr, and
+        # several records are framed so they can be told apart
+        sys.stdout = sys.stderr
+        parcel.jobs = 1
+        parcel.framed = 1 < len(params)
+
     # execute
-    executed = False
+    formats = []
     if parcel.excel_sheet:
-        do_excel_sheet(parcel, params)
-        executed = True
-
-    if parcel.excel_book:
-        do_excel_book(parcel, params)
-        executed = True
+        formats.append(('xlsx', partial(write_with_driver, 'excel', 'wb')))
+
+    # streamed formats, which may be compressed as they are written
+    suffix = ''
+    if parcel.compress:
+        from sipper.compress import inferred, suffixes
+        if parcel.compress not in suffixes:
+            sys.stderr.write(f'error: unknown compression {parcel.compress}\n')
+            sys.stderr.write(f'use: --compress {"|".join(suffixes)}\n')
+            return
+        if not parcel.csv and not parcel.npy and not parcel.reduce:
+            sys.stderr.write('error: --compress applies to -c, --npy and --reduce\n')
+            return
+        if (isinstance(parcel.output, str) and STDIO != parcel.output and
+            inferred(parcel.output) not in (None, parcel.compress)):
+            sys.stderr.write(f'error: {parcel.output} is compressed with '
+                             f'{inferred(parcel.output)}, not {parcel.compress}\n')
+            sys.stderr.write(f'use: -o without a suffix or with '
+                             f'.{suffixes[parcel.compress]}\n')
+            return
+        if 'zstd' == parcel.compress:
+            from importlib.util import find_spec
+            if find_spec('zstandard') is None:
+                sys.stderr.write('error: zstd compression requires the zstandard package\n')
+                sys.stderr.write('use: pip install zstandard\n')
+                return
+        suffix = '.' + suffixes[parcel.compress]
 
     if parcel.csv:
-        do_csv(parcel, params)
-        executed = True
+        formats.append(('csv' + suffix, partial(write_with_driver, 'csv', 'w')))
+
+    if parcel.parquet:
+        formats.append(('parquet', partial(write_with_driver, 'parquet', 'wb')))
+
+    if parcel.feather:
+        formats.append(('feather', partial(write_with_driver, 'feather', 'wb')))
+
+    if parcel.npy:
+        formats.append(('npy' + suffix, partial(write_with_driver, 'npy', 'wb')))
 
-    if not executed:
+    try:
+        from sipper.driver.avs84 import Selection
+        selection = Selection.from_parcel(parcel)
+        if selection is not None:
+            labels = [ 'wavelength (nm)', 'y', 'z' ][:avs84_shape(parcel)[1]]
+            picked = selection.indices(labels)
+            if (parcel.reduce or parcel.resample) and picked[:1] != [ 0 ]:
+                raise ValueError('--reduce and --resample need the '
+                                 'wavelength axis first in --axes')
+    except Exception as e:
+        sys.stderr.write(f'error({type(e).__name__}): {e}\n')
+        sys.stderr.write('see: sipper --manual\n')
+        return
+
+    if parcel.resample:
+        try:
+            if not isinstance(parcel.resample, str):
+                raise ValueError('--resample requires a grid or a file')
+            resample_grid(parcel)
+        except Exception as e:
+            sys.stderr.write(f'error({type(e).__name__}): {e}\n')
+            sys.stderr.write('use: --resample start:stop:step or a .raw8 file\n')
+            return
+
+    statistics = None
+    if parcel.reduce:
+        from sipper.reduce import STATISTICS, parse_statistics
+        try:
+            statistics = parse_statistics(
+                parcel.reduce if isinstance(parcel.reduce, str) else '')
+        except ValueError as e:
+            sys.stderr.write(f'error: {e}\n')
+            statistics = []
+        if 0 == len(statistics):
+            sys.stderr.write(f'use: --reduce with any of {",".join(STATISTICS)}\n')
+            return
+    elif parcel.dark:
+        sys.stderr.write('error: --dark only applies to --reduce\n')
+        return
+
+    if (0 == len(formats) and not parcel.excel_book and not parcel.stack and
+        not parcel.reduce):
         sys.stderr.write('conversion format unspecified.\n')
         sys.stderr.write('see: sipper --help\n')
+        return
+
+    if parcel.watch:
+        if parcel.excel_book or parcel.stack or parcel.reduce:
+            sys.stderr.write('error: --watch only applies to per-file outputs\n')
+            return
+        do_watch(parcel, formats)
+        return
+
+    do_conversion(parcel, params, formats, parcel.excel_book, parcel.stack,
+        statistics)
 
 
 if __name__ == '__main__':
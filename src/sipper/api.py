@@ -0,0 +1,81 @@
+import builtins
+import os
+from functools import partial
+
+from sipper import Parcel
+from sipper.archive import SEPARATOR, expand, is_archive, open_member
+from sipper.driver import DataType, Info, LazyData, find_driver, head_size
+
+
+def is_pattern(source):
+    return any(c in source for c in '*?[')
+
+
+def open_path(path):
+    if SEPARATOR in path:
+        return open_member(path)
+    return builtins.open(path, 'rb')
+
+
+def load_frame(driver, parcel, path):
+    with open_path(path) as handle:
+        return driver.read(parcel, handle).data[0].object
+
+
+def open_one(driver, parcel, path):
+    with open_path(path) as handle:
+        # without a driver, the one whose signature the file carries
+        if driver is None:
+            driver = find_driver(head=handle.read(head_size()))
+            handle.seek(0)
+        if driver is None:
+            return Info(False, { 'path': path })
+        info = driver.read(parcel, handle, probe=True)
+
+    info.properties['path'] = path
+    if info.recognized:
+        identifier = os.path.splitext(os.path.basename(path))[0]
+        info.data = [ LazyData(identifier, DataType.FRAME,
+            partial(load_frame, driver, parcel, path)) ]
+    return info
+
+
+def open(source, driver=None, **options):
+    """Open data files for reading in-process.
+
+    A single path returns its Info; a glob pattern or an iterable of paths
+    returns a generator yielding one Info per file, so any number of files
+    is processed in constant memory. Archives are read without extracting
+    them: 'data.zip' stands for its .raw8 members, 'data.tar.gz::run1/*'
+    for the members matching the pattern and 'data.zip::a.raw8' for one
+    member. Each file is read by the driver whose signature it carries,
+    or by the named `driver`. Only headers are read up front: each
+    Info carries the header properties and, if recognized, a Data whose
+    frame is decoded the first time its `object` is accessed. `options`
+    are the driver options otherwise given on the command line, e.g.
+    avs_samples=3648.
+
+        for info in sipper.open('measure/*.raw8'):
+            if info.recognized:
+                frame = info.data[0].object
+    """
+    reader = None
+    if driver is not None:
+        reader = find_driver(driver)
+        if reader is None:
+            raise ValueError(f'no driver named {driver}')
+    parcel = Parcel(**options)
+
+    if isinstance(source, (str, os.PathLike)):
+        source = os.fspath(source)
+        if SEPARATOR in source or is_archive(source):
+            if SEPARATOR in source and not is_pattern(source):
+                return open_one(reader, parcel, source)
+            source = expand(source)
+        elif not is_pattern(source):
+            return open_one(reader, parcel, source)
+        else:
+            from glob import iglob
+            source = sorted(iglob(source))
+
+    return (open_one(reader, parcel, path) for path in source)
@@ -0,0 +1,104 @@
+import io
+import os
+import threading
+
+
+# separates an archive from a member, or a pattern of members, within it,
+# e.g. data.tar.gz::run1/*.raw8
+SEPARATOR = '::'
+
+EXTENSIONS = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2',
+              '.tar.xz', '.txz')
+
+# archives opened by this process: path -> (archive, members by name, lock),
+# kept open so that the members of a compressed tar are read in one pass
+opened = {}
+opened_pid = None
+
+
+# tar archives whose members can only be reached by decompressing every
+# member before them
+STREAMED = ('.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+
+
+def is_archive(path):
+    return path.lower().endswith(EXTENSIONS)
+
+
+def is_streamed(input):
+    """Whether `input` is a member of a compressed tar archive."""
+    archive, member = split(input)
+    return member is not None and archive.lower().endswith(STREAMED)
+
+
+def split(input):
+    """Split an input into its archive and member, or return the input
+    and None if it does not name an archive member."""
+    archive, separator, member = input.partition(SEPARATOR)
+    if separator and is_archive(archive):
+        return archive, member
+    return input, None
+
+
+def container(input):
+    """The file on disk holding `input`, i.e. its archive for a member."""
+    return split(input)[0]
+
+
+def open_archive(path):
+    global opened_pid
+    # handles inherited from a parent process share its file offsets
+    if opened_pid != os.getpid():
+        opened.clear()
+        opened_pid = os.getpid()
+
+    if path not in opened:
+        if path.lower().endswith('.zip'):
+            import zipfile
+            archive = zipfile.ZipFile(path)
+            members = { info.filename: info for info in archive.infolist()
+                        if not info.is_dir() }
+        else:
+            import tarfile
+            archive = tarfile.open(path, 'r:*')
+            members = { info.name: info for info in archive.getmembers()
+                        if info.isfile() }
+        opened[path] = (archive, members, threading.Lock())
+    return opened[path]
+
+
+def expand(input):
+    """Expand an archive, or an archive and a pattern of members, into
+    one input per member, in archive order. An archive alone stands for
+    its .raw8 members. Other inputs are returned as they are."""
+    if is_archive(input) and os.path.isfile(input):
+        archive, pattern = input, None
+    else:
+        archive, pattern = split(input)
+        if pattern is None:
+            return [ input ]
+        if not any(c in pattern for c in '*?['):
+            return [ input ]
+
+    from fnmatch import fnmatchcase
+    _, members, _ = open_archive(archive)
+    return [ archive + SEPARATOR + name for name in members
+             if (fnmatchcase(name, pattern) if pattern is not None else
+                 name.lower().endswith('.raw8')) ]
+
+
+def open_member(input):
+    """Read an archive member into memory and return it as a binary file.
+    Members are read one at a time, so threads may share an archive."""
+    path, name = split(input)
+    archive, members, lock = open_archive(path)
+    info = members.get(name)
+    if info is None:
+        raise FileNotFoundError(f'{name} not found in {path}')
+
+    with lock:
+        if hasattr(archive, 'extractfile'):
+            with archive.extractfile(info) as member:
+                return io.BytesIO(member.read())
+        with archive.open(info) as member:
+            return io.BytesIO(member.read())
@@ -0,0 +1,247 @@
+import os
+import sqlite3
+import time
+from contextlib import closing
+from fnmatch import fnmatchcase
+from itertools import islice
+
+from sipper.archive import SEPARATOR, is_archive, split
+from sipper.driver.avs84 import HEADER
+from sipper.verify import BATCH, classify, failed, read_head, scan, scan_archive
+
+
+# a row per .raw8 file or archive member, and per archive whose members
+# were all listed; container_size and mtime_ns are those of the file on
+# disk, the archive for a member, and tell whether a row is still current
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path                        TEXT PRIMARY KEY,
+    container_size              INTEGER NOT NULL,
+    mtime_ns                    INTEGER NOT NULL,
+    mtime                       REAL NOT NULL,
+    size                        INTEGER NOT NULL,
+    status                      TEXT NOT NULL,
+    signature                   TEXT,
+    spectrometer_serial         TEXT,
+    spectrometer_serial_confirm TEXT,
+    sample_count                INTEGER,
+    dimension_count             INTEGER,
+    header_depth                INTEGER,
+    series_depth                INTEGER,
+    mystery                     TEXT,
+    indexed                     REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_serial ON files (spectrometer_serial);
+CREATE INDEX IF NOT EXISTS files_mtime ON files (mtime);
+CREATE TABLE IF NOT EXISTS archives (
+    path                        TEXT PRIMARY KEY,
+    container_size              INTEGER NOT NULL,
+    mtime_ns                    INTEGER NOT NULL
+);
+"""
+
+COLUMNS = [
+    'path', 'container_size', 'mtime_ns', 'mtime', 'size', 'status',
+    'signature', 'spectrometer_serial', 'spectrometer_serial_confirm',
+    'sample_count', 'dimension_count', 'header_depth', 'series_depth',
+    'mystery', 'indexed'
+]
+
+UPSERT = (f'INSERT OR REPLACE INTO files ({", ".join(COLUMNS)}) '
+          f'VALUES ({", ".join("?" * len(COLUMNS))})')
+
+
+def stamp(path):
+    """The size and modification time of the file on disk holding `path`."""
+    stat = os.stat(split(path)[0])
+    return stat.st_size, stat.st_mtime_ns
+
+
+def absolute(path):
+    archive, member = split(path)
+    if member is None:
+        return os.path.abspath(path)
+    return os.path.abspath(archive) + SEPARATOR + member
+
+
+def entry(path, shape, known):
+    """The row of `path` as a dict, None if its row in `known` is still
+    current, or an error record if it cannot be read."""
+    if isinstance(path, dict):
+        return path
+
+    try:
+        current = stamp(path)
+        if known.get(path) == current:
+            return None
+        head, size = read_head(path)
+    except Exception as e:
+        return failed(path, e)
+
+    samples, dimensions = shape
+    depth = HEADER.size + 4 * samples * dimensions
+    status, header = classify(head, size, depth)
+    header = header or {}
+    mystery = header.get('mystery')
+    return {
+        'path': path,
+        'container_size': current[0],
+        'mtime_ns': current[1],
+        'mtime': current[1] / 1e9,
+        'size': size,
+        'status': status,
+        'signature': header.get('signature'),
+        'spectrometer_serial': header.get('spectrometer_serial'),
+        'spectrometer_serial_confirm': header.get('spectrometer_serial_confirm'),
+        'sample_count': samples,
+        'dimension_count': dimensions,
+        'header_depth': min(len(head), HEADER.size),
+        'series_depth': depth,
+        'mystery': mystery.hex() if mystery is not None else None,
+        'indexed': time.time()
+    }
+
+
+class Catalog:
+    """An SQLite catalog of the headers of .raw8 files, kept up to date
+    incrementally: only files whose size or modification time changed
+    since they were last indexed are read again, and archives unchanged
+    since their members were listed are not opened at all."""
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def known(self):
+        return { path: (size, mtime_ns) for path, size, mtime_ns in
+                 self.connection.execute(
+                     'SELECT path, container_size, mtime_ns FROM files') }
+
+    def listed(self):
+        return { path: (size, mtime_ns) for path, size, mtime_ns in
+                 self.connection.execute(
+                     'SELECT path, container_size, mtime_ns FROM archives') }
+
+    def index(self, paths, shape, threads):
+        """Index every .raw8 file under `paths` on `threads` threads and
+        forget the files under them that no longer exist. Returns the
+        counts of files indexed, unchanged and removed, and the records
+        of those that could not be read, whose rows are kept."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        roots = [ absolute(path) for path in paths ]
+        known = self.known()
+        listed = self.listed()
+        seen_archives = set()
+        listing = {}
+
+        members = {}
+        for path in known:
+            archive, member = split(path)
+            if member is not None:
+                members.setdefault(archive, []).append(path)
+
+        def expand(path):
+            archive, pattern = split(path)
+            if pattern is not None:
+                yield from scan_archive(path)
+                return
+            seen_archives.add(archive)
+            try:
+                current = stamp(archive)
+            except OSError as e:
+                yield failed(archive, e)
+                return
+            if listed.get(archive) == current:
+                yield from members.get(archive, [])
+                return
+            yield from scan_archive(archive)
+            listing[archive] = current
+
+        counts = { 'indexed': 0, 'unchanged': 0, 'removed': 0 }
+        errors = []
+        seen = set()
+        found = scan(roots, expand)
+        with ThreadPoolExecutor(threads) as executor:
+            while True:
+                batch = list(islice(found, BATCH))
+                if not batch:
+                    break
+                rows = []
+                for path, row in zip(batch, executor.map(
+                        entry, batch, [ shape ] * len(batch),
+                        [ known ] * len(batch))):
+                    if row is None:
+                        seen.add(path)
+                        counts['unchanged'] += 1
+                    elif 'error' == row['status']:
+                        errors.append(row)
+                    else:
+                        seen.add(path)
+                        rows.append([ row[column] for column in COLUMNS ])
+                with self.connection:
+                    self.connection.executemany(UPSERT, rows)
+                counts['indexed'] += len(rows)
+
+        # rows under a path that failed are kept, as it may come back
+        kept = [ error['path'] for error in errors ]
+        def covered(path):
+            if path in seen or any(under(path, f) for f in kept):
+                return False
+            return any(under(path, root) for root in roots)
+
+        vanished = [ path for path in known if covered(path) ]
+        gone = [ path for path in listed
+                 if path not in seen_archives and covered(path) ]
+        # an archive counts as listed once all its members are indexed
+        listing = [ (archive, *current) for archive, current in listing.items()
+                    if not any(under(f, archive) for f in kept) ]
+        with self.connection:
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO archives VALUES (?, ?, ?)', listing)
+            self.connection.executemany('DELETE FROM files WHERE path = ?',
+                [ (path,) for path in vanished ])
+            self.connection.executemany('DELETE FROM archives WHERE path = ?',
+                [ (path,) for path in gone ])
+        counts['removed'] = len(vanished)
+        return counts, errors
+
+
+def under(path, root):
+    """Whether `path` is `root` or lies within it, be it a directory, an
+    archive or a pattern of archive members."""
+    if path == root:
+        return True
+    archive, pattern = split(root)
+    if pattern is not None and any(c in pattern for c in '*?['):
+        name, member = split(path)
+        return name == archive and member is not None and \
+               fnmatchcase(member, pattern)
+    return path.startswith(root + os.sep) or \
+           (is_archive(root) and path.startswith(root + SEPARATOR))
+
+
+def select(path, where=None):
+    """The paths of the good files in the catalog at `path` for which the
+    SQL expression `where` holds, e.g. "spectrometer_serial = 'X'", in
+    path order. The catalog is opened read only."""
+    from pathlib import Path
+
+    if not os.path.isfile(path):
+        raise FileNotFoundError(f'catalog {path} not found')
+    uri = Path(path).absolute().as_uri() + '?mode=ro'
+    query = "SELECT path FROM files WHERE status = 'good'"
+    if where:
+        query += f' AND ({where})'
+    with closing(sqlite3.connect(uri, uri=True)) as connection:
+        return [ found for found, in connection.execute(query + ' ORDER BY path') ]
@@ -0,0 +1,62 @@
+import io
+from contextlib import contextmanager
+
+
+# compression: file name suffix
+suffixes = {
+    'gzip': 'gz',
+    'zstd': 'zst',
+    'xz': 'xz'
+}
+
+
+def inferred(path):
+    """The compression implied by the suffix of `path`, if any."""
+    for compression, suffix in suffixes.items():
+        if path.lower().endswith('.' + suffix):
+            return compression
+    return None
+
+
+def strip_suffix(path):
+    compression = inferred(path)
+    if compression is None:
+        return path
+    return path[:-len(suffixes[compression]) - 1]
+
+
+def with_suffix(path, compression):
+    """`path` with the suffix of `compression`, unless it has one."""
+    if compression is None or inferred(path) is not None:
+        return path
+    return path + '.' + suffixes[compression]
+
+
+def open_compressed(raw, compression):
+    """Wrap the binary stream `raw` in a writer compressing into it.
+    Closing the writer finishes the compressed stream but leaves `raw`
+    open. zstd compresses on as many threads as there are cores."""
+    if 'gzip' == compression:
+        import gzip
+        # no timestamp, so that equal data compresses to equal files
+        return gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6, mtime=0)
+    if 'xz' == compression:
+        import lzma
+        return lzma.LZMAFile(raw, 'wb')
+    if 'zstd' == compression:
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError('zstd compression requires the zstandard package')
+        compressor = zstandard.ZstdCompressor(level=3, threads=-1)
+        return compressor.stream_writer(raw, closefd=False)
+    raise ValueError(f'unknown compression {compression}')
+
+
+@contextmanager
+def compressed(raw, compression, text):
+    """A text or binary handle writing through `compression` into `raw`."""
+    stream = open_compressed(raw, compression)
+    handle = io.TextIOWrapper(stream, encoding='utf-8') if text else stream
+    with handle:
+        yield handle
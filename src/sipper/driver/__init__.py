@@ -2,6 +2,7 @@ from dataclasses import dataclass
 from typing import Any, List
 from abc import ABC, abstractmethod 
 from enum import Enum
+from importlib import import_module
 
 
 class DataType(Enum):
@@ -15,6 +16,30 @@ class Data:
     object: Any = None
 
 
+class LazyData(Data):
+    """Data whose object is only produced, by calling `load`, once it is
+    first accessed."""
+
+    def __init__(self, identifier, type, load):
+        self._load = load
+        super().__init__(identifier, type)
+
+    @property
+    def object(self):
+        if self._load is not None:
+            self._object = self._load()
+            self._load = None
+        return self._object
+
+    @object.setter
+    def object(self, value):
+        self._object = value
+
+    def __repr__(self):
+        state = 'loaded' if self._load is None else 'not loaded'
+        return f'LazyData(identifier={self.identifier!r}, type={self.type}, {state})'
+
+
 @dataclass
 class Info:
     recognized: bool
@@ -24,6 +49,9 @@ class Info:
 
 class Driver(ABC):
 
+    # (offset, magic bytes) pairs identifying the files the driver reads
+    signatures = ()
+
     @abstractmethod
     def name(self) -> str:
         pass
@@ -54,31 +82,97 @@ class Driver(ABC):
 
 
 # TODO: temporary: probe each module in the driver packages to obtain
-# a driver instance.
-from sipper.driver.avs84 import AVS84Driver
-from sipper.driver.excel import ExcelDriver
-from sipper.driver.csv import CSVDriver
+# a driver instance. Until then each driver's name and aliases are listed
+# here along with where its class lives, so that a driver module (and
+# whatever it depends on) is only imported once the driver is looked up,
+# and the signatures the class declares, so that files are told apart
+# without importing every driver. Keep in step with the driver classes.
+drivers = [
+    ('avs84'  , [ 'avs84', 'raw8' ]          , 'sipper.driver.avs84'  , 'AVS84Driver'  , [ (0, b'AVS84') ]),
+    ('excel'  , [ 'excel', 'xlsx' ]          , 'sipper.driver.excel'  , 'ExcelDriver'  , []               ),
+    ('csv'    , [ 'csv' ]                    , 'sipper.driver.csv'    , 'CSVDriver'    , []               ),
+    ('parquet', [ 'parquet', 'pq' ]          , 'sipper.driver.parquet', 'ParquetDriver', []               ),
+    ('feather', [ 'feather', 'arrow', 'ipc' ], 'sipper.driver.arrow'  , 'FeatherDriver', []               ),
+    ('npy'    , [ 'npy', 'numpy' ]           , 'sipper.driver.npy'    , 'NPYDriver'    , []               )
+]
 
+instances = {}
+
+# the signatures of the drivers, indexed on first use
+signature_index = None
+signature_depth = 0
+
+
+def index_signatures():
+    """Index the signatures of every driver by offset, then by length and
+    magic bytes, longest first, so that a file is matched with a lookup per
+    distinct offset and length rather than a probe per driver."""
+    global signature_index, signature_depth
+    if signature_index is not None:
+        return signature_index
+
+    index = {}
+    depth = 0
+    for name, _, _, _, signatures in drivers:
+        for offset, magic in signatures:
+            index.setdefault(offset, {}).setdefault(len(magic), {})[magic] = name
+            depth = max(depth, offset + len(magic))
+
+    signature_depth = depth
+    signature_index = [ (offset, sorted(index[offset].items(), reverse=True))
+                        for offset in sorted(index) ]
+    return signature_index
+
+
+def head_size():
+    """The number of bytes at the start of a file that cover every
+    signature."""
+    index_signatures()
+    return signature_depth
+
+
+def detect(head):
+    """The name of the driver whose signature `head`, the first head_size()
+    or more bytes of a file, carries, or None. The longest signature at the
+    lowest offset wins."""
+    for offset, lengths in index_signatures():
+        for length, magics in lengths:
+            name = magics.get(bytes(head[offset:offset + length]))
+            if name is not None:
+                return name
+    return None
+
+
+def load_driver(module, cls):
+    key = (module, cls)
+    if key not in instances:
+        instances[key] = getattr(import_module(module), cls)()
+    return instances[key]
+
+
+def __getattr__(name):
+    # the full registry imports every driver, only build it on request
+    if name == 'registry':
+        return [ load_driver(module, cls) for _, _, module, cls, _ in drivers ]
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
-registry = [
-    AVS84Driver(),
-    ExcelDriver(),
-    CSVDriver()
-]
 
+def find_driver(name=None, alias=None, head=None):
+    """Look a driver up by name, by alias, or by the signature carried by
+    `head`, the first bytes of a file."""
+    if head is not None and name is None:
+        name = detect(head)
 
-def find_driver(name=None, alias=None):
     if isinstance(name, str):
         lname = name.lower()
-        for driver in registry:
-            if driver.name.lower() == lname:
-                return driver
+        for dname, _, module, cls, _ in drivers:
+            if dname == lname:
+                return load_driver(module, cls)
     
     if isinstance(alias, str):
         lalias = alias.lower()
-        for driver in registry:
-            for dalias in driver.aliases():
-                if dalias.lower() == lalias:
-                    return driver
+        for _, daliases, module, cls, _ in drivers:
+            if lalias in daliases:
+                return load_driver(module, cls)
 
-    return None
\ No newline at end of file
+    return None
@@ -0,0 +1,44 @@
+from sipper.driver import Driver
+
+
+def frame_table(frame):
+    """Build an Arrow table over a frame's columns, keeping their float32
+    dtype, with the frame's header properties as schema metadata."""
+    import pyarrow as pa
+
+    data = frame.object
+    values = data.to_numpy()
+    table = pa.table({ str(l): values[:, i]
+                       for i, l in enumerate(data.columns) })
+    metadata = { str(k): str(v) for k, v in data.attrs.items() }
+    return table.replace_schema_metadata(metadata)
+
+
+class FeatherDriver(Driver):
+
+    def name(self):
+        return 'feather'
+
+    def version(self):
+        return '0.0.0'
+
+    def description(self):
+        return 'Apache Arrow IPC (Feather v2) file'
+
+    def aliases(self):
+        return [ 'feather', 'arrow', 'ipc' ]
+
+    def cloptions(self):
+        return []
+
+    def read(self, parcel, handle, probe=False):
+        pass
+
+    def write(self, parcel, frames, handle):
+        from pyarrow import feather
+
+        for frame in frames:
+            feather.write_feather(frame_table(frame), handle)
+
+    def exec(self, parcel, output, input):
+        pass
@@ -1,15 +1,226 @@
-import struct
-from typing import IO
-
-import pandas as pd
+import numpy as np
 
 from sipper import Parcel
 from sipper.getopt import Option
-from sipper.driver import Driver, Info
+from sipper.driver import Data, DataType, Driver, Info
+from sipper.driver.layout import Field, Layout
+
+
+# see the HEADER table in the README, unnamed fields are not understood yet;
+# the mystery block holds the few bytes that change from file to file
+HEADER = Layout([
+    Field('signature'                  , 0x0000, 'ascii', 5  ),
+    Field('mystery'                    , 0x0005, 'block', 9  ),
+    Field('spectrometer_serial'        , 0x000e, 'ascii', 9  ),
+    Field(None                         , 0x0017, 'block', 1  ),
+    Field('spectrometer_serial_confirm', 0x0018, 'ascii', 9  ),
+    Field(None                         , 0x0021, 'block', 3  ),
+    Field(None                         , 0x0024, 'block', 292)
+])
+
+
+def read_header(handle, head=b''):
+    """Read the header with a single read, or the rest of it after `head`,
+    its first bytes already read, e.g. to detect the format. Returns the
+    header fields and the depth reached, which falls short of HEADER.size
+    on short files."""
+    buffer = head + handle.read(HEADER.size - len(head))
+    if len(buffer) < HEADER.size:
+        return dict.fromkeys(HEADER.names, ''), handle.tell()
+    return HEADER.unpack(buffer), handle.tell()
+
+
+def recognized(header, depth):
+    """Whether the `header` fields, read up to `depth`, are those of an
+    AVS84 file: the signature, and a 9 character spectrometer serial
+    confirmed by its second copy, in a header read in full."""
+    serial = header['spectrometer_serial']
+    return (
+        'AVS84'                               == header['signature'] and
+        9                                     == len(serial)         and
+        header['spectrometer_serial_confirm'] == serial              and
+        HEADER.size                           == depth
+    )
+
+
+# the first axis holds the wavelengths the others were sampled at
+AXIS_LABELS = [ 'wavelength (nm)', 'y', 'z' ]
+
+# series are stored as consecutive little endian IEEE-754 singles
+SERIES_DTYPE = np.dtype('<f4')
+
+# see the FOOTER table in the README, written as observed
+FOOTER = (bytes(13612) + np.array(1.0, SERIES_DTYPE).tobytes() + bytes(5) +
+          np.full(471, 10.0, SERIES_DTYPE).tobytes()[:1884] + bytes(1883))
+
+# stands in for the serial of frames that did not come from a spectrometer
+DEFAULT_SERIAL = 'SIPPER000'
+
+
+def read_series(handle, samples, axes):
+    """Read `axes` consecutive series of `samples` floats with a single
+    read and return them as an (axes, samples) array viewing the buffer."""
+    buffer_size = SERIES_DTYPE.itemsize * samples
+    buffer = handle.read(buffer_size * axes)
+    size = len(buffer)
+    if buffer_size * axes != size:
+        axis = size // buffer_size
+        raise ValueError(
+            f'buffer size expected {buffer_size}, but was {size - axis * buffer_size} on axis {axis}')
+    return np.frombuffer(buffer, dtype=SERIES_DTYPE).reshape(axes, samples)
+
+
+class Selection:
+    """The axes and the range of samples to read out of the series,
+    given as comma separated axis labels or indices, a start:stop range
+    of samples and a low:high range of wavelengths in nm, any of which
+    may be None to read everything."""
+
+    def __init__(self, axes=None, samples=None, wavelength=None):
+        self.axes = axes
+        self.samples = samples
+        self.wavelength = wavelength
+        if samples is not None:
+            if ':' not in samples:
+                raise ValueError(f'samples {samples} is not start:stop')
+            start, stop = samples.split(':')
+            self.start = int(start) if start else None
+            self.stop = int(stop) if stop else None
+        if wavelength is not None:
+            if ':' not in wavelength:
+                raise ValueError(f'wavelength {wavelength} is not low:high')
+            low, high = wavelength.split(':')
+            self.low = float(low) if low else -np.inf
+            self.high = float(high) if high else np.inf
+
+    @classmethod
+    def from_parcel(cls, parcel):
+        """The selection given by parcel.axes, parcel.samples and
+        parcel.wavelength, or None to read everything."""
+        if parcel.axes is None and parcel.samples is None and \
+           parcel.wavelength is None:
+            return None
+        return cls(parcel.axes, parcel.samples, parcel.wavelength)
+
+    def indices(self, labels):
+        if self.axes is None:
+            return list(range(len(labels)))
+        indices = []
+        for axis in self.axes.split(','):
+            axis = axis.strip()
+            if axis.isdigit() and int(axis) < len(labels):
+                indices.append(int(axis))
+            elif axis in labels:
+                indices.append(labels.index(axis))
+            elif axis == 'wavelength':
+                indices.append(0)
+            else:
+                raise ValueError(f'no axis {axis} among {", ".join(labels)}')
+        return indices
+
+    def range(self, samples):
+        if self.samples is None:
+            return 0, samples
+        start, stop, _ = slice(self.start, self.stop).indices(samples)
+        return start, max(start, stop)
+
+
+def read_ranges(handle, ranges):
+    """Read (offset, size) byte ranges, merging adjacent ones into single
+    reads. Files are read with os.pread where there is one, which neither
+    moves nor fills their buffer, and other handles by seeking. Returns a
+    buffer each."""
+    reads = []
+    for offset, size in sorted(set(ranges)):
+        if reads and reads[-1][0] + reads[-1][1] == offset:
+            reads[-1][1] += size
+        else:
+            reads.append([ offset, size ])
+
+    import os
+    # os.pread is not available on Windows, which seeks instead
+    fd = None
+    if hasattr(os, 'pread'):
+        try:
+            fd = handle.fileno()
+        except (AttributeError, OSError):
+            pass
+
+    buffers = {}
+    for offset, size in reads:
+        if fd is not None:
+            buffer = os.pread(fd, size, offset)
+            # a pread may fall short before the end of the file
+            while 0 < len(buffer) < size:
+                more = os.pread(fd, size - len(buffer), offset + len(buffer))
+                if not more:
+                    break
+                buffer += more
+        else:
+            handle.seek(offset)
+            buffer = handle.read(size)
+        if len(buffer) != size:
+            raise ValueError(
+                f'buffer size expected {size}, but was {len(buffer)} at {offset:#06x}')
+        buffers[offset] = memoryview(buffer)
+
+    # hand out slices of the merged reads
+    results = []
+    for offset, size in ranges:
+        start = max(o for o in buffers if o <= offset)
+        results.append(buffers[start][offset - start:offset - start + size])
+    return results
+
+
+def read_selected_series(handle, samples, axes, labels, selection):
+    """Read the axes and samples picked by `selection` out of `axes`
+    series of `samples` floats starting at the current position of
+    `handle`, reading no more than it takes: the wavelength axis over the
+    sample range if a wavelength range is to be found in it, then only
+    the picked axes over the final range. Returns the (picked axes,
+    selected samples) array, their labels, the sample range and the
+    number of bytes read, and leaves `handle` at the depth reached."""
+    base = handle.tell()
+    itemsize = SERIES_DTYPE.itemsize
+    picked = selection.indices(labels[:axes])
+    start, stop = selection.range(samples)
+
+    depth = base
+    read = 0
+    def ranges(indices, start, stop):
+        nonlocal depth, read
+        ranges = [ (base + itemsize * (axis * samples + start),
+                    itemsize * (stop - start)) for axis in indices ]
+        depth = max([ depth ] + [ o + s for o, s in ranges if s ])
+        read += sum(s for _, s in set(ranges))
+        return ranges
+
+    wavelengths = None
+    if selection.wavelength is not None:
+        buffer, = read_ranges(handle, ranges([ 0 ], start, stop))
+        wavelengths = np.frombuffer(buffer, dtype=SERIES_DTYPE)
+        inside = np.flatnonzero((selection.low <= wavelengths) &
+                                (wavelengths <= selection.high))
+        first, last = (inside[0], inside[-1] + 1) if len(inside) else (0, 0)
+        wavelengths = wavelengths[first:last]
+        start, stop = start + first, start + last
+
+    # the wavelengths were read already
+    rest = [ axis for axis in picked if axis != 0 or wavelengths is None ]
+    buffers = dict(zip(rest, read_ranges(handle, ranges(rest, start, stop))))
+    series = np.empty((len(picked), stop - start), dtype=SERIES_DTYPE)
+    for row, axis in enumerate(picked):
+        series[row] = wavelengths if axis not in buffers else \
+            np.frombuffer(buffers[axis], dtype=SERIES_DTYPE)
+
+    handle.seek(depth)
+    return series, [ labels[axis] for axis in picked ], (start, stop), read
 
 
 class AVS84Driver(Driver):
 
+    signatures = ((0, b'AVS84'),)
+
     def name(self):
         return 'avs84'
 
@@ -25,7 +236,10 @@ class AVS84Driver(Driver):
     def cloptions(self):
         return [
             Option('avs:s', 'avs:samples', 'avs_samples'),
-            Option('avs:a', 'avs:axes', 'avs_axes')
+            Option('avs:a', 'avs:axes', 'avs_axes'),
+            Option(long='axes'),
+            Option(long='samples'),
+            Option(long='wavelength')
         ]
 
     def read(self, parcel, handle, probe=False):
@@ -33,17 +247,14 @@ class AVS84Driver(Driver):
         if not isinstance(parcel, Parcel):
             parcel = Parcel()
 
-        if not isinstance(handle, IO):
+        if not hasattr(handle, 'read'):
             return None
 
         # header
-        signature = handle.read(5).decode('ascii')
-        handle.read(9)
-        serial = handle.read(9).decode('ascii')
-        handle.read(1)
-        confirm_serial = handle.read(9).decode('ascii')
-        handle.read(295)
-        depth = handle.tell()
+        header, depth = read_header(handle)
+        signature = header['signature']
+        serial = header['spectrometer_serial']
+        confirm_serial = header['spectrometer_serial_confirm']
 
         properties = {
             'signature': signature,
@@ -52,15 +263,9 @@ class AVS84Driver(Driver):
             'header_depth': depth
         }
 
-        recognized = (
-            'AVS84'        == signature   and
-            9              == len(serial) and
-            confirm_serial == serial      and
-            328            == depth
-        )
-
-        if not recognized or probe:
-            return Info(recognized, properties)
+        known = recognized(header, depth)
+        if not known or probe:
+            return Info(known, properties)
 
         # TODO: figure out where sample count and column
         # count are encoded in the RAW 8 file (maybe an
@@ -77,23 +282,55 @@ class AVS84Driver(Driver):
 
         samples = max(samples, 0)
         axes = max(axes, 0)
-        # 4-byte floating points per axis
-        buffer_size = 4 * samples
-        series = []
-
-        for axis in range(axes):
-            buffer = handle.read(buffer_size)
-            size = len(buffer)
-            if buffer_size != size:
-                raise ValueError(
-                    f'buffer size expected {buffer_size}, but was {size} on axis {axis}')
-            series.append(struct.unpack(f'<{samples}f', buffer))
-
-        data = pd.DataFrame(
-            { i: s for i, s in enumerate(series) })
-
-        return Info(recognized, properties, data)
-
-    def write(self, parcel, frame, handle):
-        raise NotImplementedError(
-            'AVS84Driver.write is not supported yet.')
\ No newline at end of file
+        labels = AXIS_LABELS + [ str(axis) for axis in range(3, axes) ]
+        labels = labels[:axes]
+
+        selection = Selection.from_parcel(parcel)
+        if selection is None:
+            series = read_series(handle, samples, axes)
+        else:
+            series, labels, (start, stop), _ = read_selected_series(
+                handle, samples, axes, labels, selection)
+            properties['sample_range'] = f'{start}:{stop}'
+
+        properties['sample_count'] = samples
+        properties['axis_count'] = axes
+        properties['file_depth'] = handle.tell()
+
+        import pandas as pd
+
+        # columns are views into the series buffer, nothing is copied
+        data = pd.DataFrame(series.T, columns=labels, copy=False)
+        data.attrs.update(properties)
+
+        return Info(True, properties,
+            [ Data('series', DataType.FRAME, data) ])
+
+    def write(self, parcel, frames, handle):
+        """Write each frame as an AVS84 file: the header, every axis as a
+        series in a single write, and the footer as far as it is known.
+        The spectrometer serial is taken from the frame's header properties
+        if it has them, else from parcel.avs_serial."""
+        # defaults
+        if not isinstance(parcel, Parcel):
+            parcel = Parcel()
+
+        for frame in frames:
+            data = frame.object
+            serial = data.attrs.get('spectrometer_serial',
+                parcel.avs_serial or DEFAULT_SERIAL)
+            if 9 != len(serial):
+                raise ValueError(f'spectrometer serial {serial} is not 9 long')
+
+            handle.write(HEADER.pack({
+                'signature': 'AVS84',
+                'spectrometer_serial': serial,
+                'spectrometer_serial_confirm': serial
+            }))
+            # (samples, axes) to consecutive little endian series
+            series = np.ascontiguousarray(data.to_numpy().T, dtype=SERIES_DTYPE)
+            handle.write(series.tobytes())
+            handle.write(FOOTER)
+
+    def exec(self, parcel, output, input):
+        pass
\ No newline at end of file
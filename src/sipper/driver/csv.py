@@ -1,26 +1,96 @@
+import csv
+
+import numpy as np
+
+from sipper import Parcel, getelse
 from sipper.getopt import Option
 from sipper.driver import Driver, Info
 
 
+# rows formatted per write, bounds the text held in memory at once
+CHUNK_ROWS = 4096
+
+
+def format_cells(block, float_format):
+    if float_format is None:
+        # shortest round-trip representation of each float32
+        cells = block.astype(str)
+    else:
+        cells = np.char.mod(float_format, block)
+    cells[np.isnan(block)] = ''
+    return cells
+
+
+def format_rows(block, float_format, index=None):
+    """Format a (rows, columns) block of floats into CSV lines. Formatting
+    is done a whole block at a time, never a Python call per cell."""
+    if float_format is not None and not np.isnan(block).any():
+        # a single printf over the block is far cheaper than per-cell
+        # formatting; the index is interleaved as an integer column
+        row = ','.join([ float_format ] * block.shape[1]) + '\n'
+        if index is not None:
+            row = '%d,' + row
+            block = np.column_stack((index, block))
+        return (row * len(block)) % tuple(block.ravel().tolist())
+
+    cells = format_cells(block, float_format)
+    if index is not None:
+        cells = np.column_stack((index.astype(str), cells))
+    return '\n'.join(map(','.join, cells.tolist())) + '\n'
+
+
 class CSVDriver(Driver):
 
     def name(self):
-        pass
+        return 'csv'
 
     def version(self):
-        pass
+        return '0.0.0'
 
     def description(self):
-        pass
+        return 'Comma-separated values'
 
     def aliases(self):
-        pass
+        return [ 'csv' ]
 
     def cloptions(self):
-        return []
+        return [
+            Option(long='float-format')
+        ]
 
     def read(self, parcel, handle, probe=False):
         pass
 
-    def write(self, parcel, frame, handle):
-        pass
\ No newline at end of file
+    def write(self, parcel, frames, handle):
+        # defaults
+        if not isinstance(parcel, Parcel):
+            parcel = Parcel()
+
+        write_index = getelse(parcel, 'write_index', False)
+        write_header = getelse(parcel, 'write_header', False)
+        float_format = parcel.float_format
+
+        for frame in frames:
+            data = frame.object
+            values = data.to_numpy()
+
+            if parcel.framed:
+                # lets a reader split a stream of many records apart
+                lines = len(values) + (1 if write_header else 0)
+                handle.write(f'#frame\t{frame.identifier}\t{lines}\n')
+
+            if write_header:
+                labels = [ str(l) for l in data.columns ]
+                if write_index:
+                    labels.insert(0, '')
+                csv.writer(handle, lineterminator='\n').writerow(labels)
+
+            for start in range(0, len(values), CHUNK_ROWS):
+                block = values[start:start + CHUNK_ROWS]
+                index = None
+                if write_index:
+                    index = np.asarray(data.index[start:start + len(block)])
+                handle.write(format_rows(block, float_format, index))
+
+    def exec(self, parcel, output, input):
+        pass
@@ -1,20 +1,36 @@
+import re
+
+import numpy as np
+
+from sipper import Parcel, getelse
 from sipper.getopt import Option
 from sipper.driver import Driver, Info
 
 
+# rows handed to the worksheet per batch
+CHUNK_ROWS = 4096
+
+# characters Excel refuses in sheet titles, which are at most 31 long
+invalid_title = re.compile(r'[\\*?:/\[\]]')
+
+
+def sheet_title(identifier):
+    return invalid_title.sub('_', str(identifier))[:31] or 'Sheet'
+
+
 class ExcelDriver(Driver):
 
     def name(self):
-        pass
+        return 'excel'
 
     def version(self):
-        pass
+        return '0.0.0'
 
     def description(self):
-        pass
+        return 'Microsoft Excel workbook'
 
     def aliases(self):
-        pass
+        return [ 'excel', 'xlsx' ]
 
     def cloptions(self):
         return []
@@ -22,5 +38,61 @@ class ExcelDriver(Driver):
     def read(self, parcel, handle, probe=False):
         pass
 
-    def write(self, parcel, frame, handle):
-        pass
\ No newline at end of file
+    def write(self, parcel, frames, handle):
+        """Write each frame to its own sheet through a write-only workbook.
+        Rows are streamed to disk as they are appended, so memory use does
+        not grow with the number of frames. `frames` may be a generator."""
+        from openpyxl import Workbook
+
+        # defaults
+        if not isinstance(parcel, Parcel):
+            parcel = Parcel()
+
+        write_index = getelse(parcel, 'write_index', False)
+        write_header = getelse(parcel, 'write_header', False)
+
+        book = Workbook(write_only=True)
+        try:
+            self.write_sheets(book, frames, write_index, write_header)
+        except BaseException:
+            # finish the sheets streamed so far, whose temporary files
+            # would otherwise be flushed after they were closed
+            for sheet in book.worksheets:
+                try:
+                    sheet.close()
+                except Exception:
+                    pass
+            raise
+
+        # a workbook needs at least one sheet to be valid
+        if 0 == len(book.worksheets):
+            book.create_sheet()
+        book.save(handle)
+
+    def write_sheets(self, book, frames, write_index, write_header):
+        for frame in frames:
+            data = frame.object
+            values = data.to_numpy()
+            sheet = book.create_sheet(sheet_title(frame.identifier))
+
+            if write_header:
+                labels = [ str(l) for l in data.columns ]
+                if write_index:
+                    labels.insert(0, None)
+                sheet.append(labels)
+
+            for start in range(0, len(values), CHUNK_ROWS):
+                block = values[start:start + CHUNK_ROWS]
+                rows = block.tolist()
+                if np.isnan(block).any():
+                    # NaN is not a valid cell value, leave them empty
+                    rows = [ [ None if v != v else v for v in row ]
+                             for row in rows ]
+                if write_index:
+                    index = data.index[start:start + len(rows)].tolist()
+                    rows = [ [ i ] + row for i, row in zip(index, rows) ]
+                for row in rows:
+                    sheet.append(row)
+
+    def exec(self, parcel, output, input):
+        pass
@@ -0,0 +1,145 @@
+from dataclasses import dataclass
+from struct import Struct
+from typing import List
+
+
+# type: (struct code, numpy code, size of one item in bytes)
+types = {
+    'ascii': ('s', 'S',   1),
+    'block': ('s', 'V',   1),
+    'u8'   : ('B', 'u1',  1),
+    'i8'   : ('b', 'i1',  1),
+    'u16'  : ('H', '<u2', 2),
+    'i16'  : ('h', '<i2', 2),
+    'u32'  : ('I', '<u4', 4),
+    'i32'  : ('i', '<i4', 4),
+    'f32'  : ('f', '<f4', 4),
+    'f64'  : ('d', '<f8', 8)
+}
+
+
+@dataclass
+class Field:
+    name: str
+    offset: int
+    type: str
+    size: int
+
+
+class Layout:
+    """A fixed binary layout described as a table of fields, much like the
+    format tables in the README. The table is compiled once into a
+    struct.Struct, so a whole record decodes from a single read, and into
+    a NumPy structured dtype on demand, so many records decode at once from
+    one buffer. Fields without a name are skipped, as are gaps between
+    fields. All numbers are little endian."""
+
+    def __init__(self, fields: List[Field], size=None):
+        self.fields = sorted(fields, key=lambda f: f.offset)
+        self.named = [ f for f in self.fields if f.name is not None ]
+        self.size = max([ f.offset + f.size for f in self.fields ] + [ size or 0 ])
+        self._dtype = None
+
+        codes = []
+        depth = 0
+        for field in self.fields:
+            if field.offset < depth:
+                raise ValueError(f'field at {field.offset:#06x} overlaps')
+            if field.type not in types:
+                raise ValueError(f'field type {field.type} unsupported')
+            code, _, itemsize = types[field.type]
+            if field.size % itemsize:
+                raise ValueError(
+                    f'field at {field.offset:#06x} is not a whole number of {field.type}')
+
+            if depth < field.offset:
+                codes.append(f'{field.offset - depth}x')
+            if field.name is None:
+                codes.append(f'{field.size}x')
+            elif code == 's':
+                codes.append(f'{field.size}s')
+            else:
+                codes.append(f'{field.size // itemsize}{code}')
+            depth = field.offset + field.size
+
+        if depth < self.size:
+            codes.append(f'{self.size - depth}x')
+        self.struct = Struct('<' + ''.join(codes))
+
+    @property
+    def names(self):
+        return [ f.name for f in self.named ]
+
+    @property
+    def dtype(self):
+        """The structured dtype of one record, compiled on first use."""
+        if self._dtype is None:
+            import numpy as np
+
+            formats = []
+            for field in self.named:
+                _, code, itemsize = types[field.type]
+                if code in ('S', 'V'):
+                    formats.append(f'{code}{field.size}')
+                elif field.size == itemsize:
+                    formats.append(code)
+                else:
+                    formats.append((code, (field.size // itemsize,)))
+
+            self._dtype = np.dtype({
+                'names': self.names,
+                'formats': formats,
+                'offsets': [ f.offset for f in self.named ],
+                'itemsize': self.size
+            })
+        return self._dtype
+
+    def unpack(self, buffer, offset=0):
+        """Decode one record from `buffer` into a dict of field values.
+        ascii fields become str, blocks bytes, single numbers scalars and
+        numeric arrays tuples."""
+        values = iter(self.struct.unpack_from(buffer, offset))
+        record = {}
+        for field in self.named:
+            code, _, itemsize = types[field.type]
+            if code == 's':
+                value = next(values)
+                if field.type == 'ascii':
+                    value = value.decode('ascii', errors='replace')
+            elif field.size == itemsize:
+                value = next(values)
+            else:
+                value = tuple(next(values) for _ in range(field.size // itemsize))
+            record[field.name] = value
+        return record
+
+    def pack(self, record):
+        """Encode a dict of field values, as returned by unpack, into one
+        record. Missing fields and unnamed ones are zero filled."""
+        values = []
+        for field in self.named:
+            code, _, itemsize = types[field.type]
+            value = record.get(field.name)
+            if code == 's':
+                if isinstance(value, str):
+                    value = value.encode('ascii')
+                values.append(value or b'')
+            elif field.size == itemsize:
+                values.append(value or 0)
+            else:
+                values.extend(value or [ 0 ] * (field.size // itemsize))
+        return self.struct.pack(*values)
+
+    def read(self, handle):
+        """Read and decode one record with a single read, or return None
+        if the handle ends before the record does."""
+        buffer = handle.read(self.size)
+        if len(buffer) < self.size:
+            return None
+        return self.unpack(buffer)
+
+    def unpack_many(self, buffer, count=-1, offset=0):
+        """Decode consecutive records from `buffer` at once as a NumPy
+        structured array viewing the buffer."""
+        import numpy as np
+        return np.frombuffer(buffer, dtype=self.dtype, count=count, offset=offset)
@@ -0,0 +1,33 @@
+import numpy as np
+
+from sipper.driver import Driver
+
+
+class NPYDriver(Driver):
+
+    def name(self):
+        return 'npy'
+
+    def version(self):
+        return '0.0.0'
+
+    def description(self):
+        return 'NumPy array file'
+
+    def aliases(self):
+        return [ 'npy', 'numpy' ]
+
+    def cloptions(self):
+        return []
+
+    def read(self, parcel, handle, probe=False):
+        pass
+
+    def write(self, parcel, frames, handle):
+        # a (samples, axes) float32 array; the format has no room for
+        # anything but dtype and shape, so header properties are dropped
+        for frame in frames:
+            np.save(handle, frame.object.to_numpy(), allow_pickle=False)
+
+    def exec(self, parcel, output, input):
+        pass
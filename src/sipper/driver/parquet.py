@@ -0,0 +1,32 @@
+from sipper.driver import Driver
+from sipper.driver.arrow import frame_table
+
+
+class ParquetDriver(Driver):
+
+    def name(self):
+        return 'parquet'
+
+    def version(self):
+        return '0.0.0'
+
+    def description(self):
+        return 'Apache Parquet file'
+
+    def aliases(self):
+        return [ 'parquet', 'pq' ]
+
+    def cloptions(self):
+        return []
+
+    def read(self, parcel, handle, probe=False):
+        pass
+
+    def write(self, parcel, frames, handle):
+        from pyarrow import parquet
+
+        for frame in frames:
+            parquet.write_table(frame_table(frame), handle)
+
+    def exec(self, parcel, output, input):
+        pass
@@ -58,7 +58,7 @@ def getopt(args, opts):
 
         if arg == '--':
             noopts = True
-        elif not noopts and arg.startswith('-'):
+        elif not noopts and arg.startswith('-') and arg != '-':
             is_long = arg.startswith('--')
             opt_map = long_map if is_long else short_map
 
@@ -82,7 +82,7 @@ def getopt(args, opts):
             if len(pair) >= 2:
                 parcel[alias] = pair[1]
             elif not is_final and \
-                 not ahead.startswith('-') and \
+                 (not ahead.startswith('-') or ahead == '-') and \
                  desc.takevalue:
                 i += 1
                 parcel[alias] = ahead
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+from functools import partial
+
+from sipper.archive import container
+
+
+MANIFEST_NAME = '.sipper-manifest.json'
+
+
+def file_hash(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as fin:
+        for chunk in iter(partial(fin.read, 1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Manifest:
+    """Records the size, mtime and optionally a content hash of every
+    converted input along with the outputs produced from it, so that a
+    later run only converts inputs that are new or have changed. Archive
+    members are tracked by the state of their archive."""
+
+    def __init__(self, directory, hash=False):
+        self.path = os.path.join(directory, MANIFEST_NAME)
+        self.hash = hash
+        self.entries = {}
+        self.pending = {}
+        if os.path.exists(self.path):
+            with open(self.path, 'r') as fin:
+                self.entries = json.load(fin).get('entries', {})
+
+    def owns(self, source, output):
+        entry = self.entries.get(os.path.abspath(source), {})
+        return os.path.abspath(output) in entry.get('outputs', [])
+
+    def changed(self, source, outputs):
+        """Whether `source` must be converted again to produce `outputs`."""
+        key = os.path.abspath(source)
+        try:
+            stat = os.stat(container(source))
+        except OSError:
+            return True
+
+        state = { 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns }
+        self.pending[key] = state
+
+        entry = self.entries.get(key)
+        if entry is None:
+            return True
+        for output in map(os.path.abspath, outputs):
+            if output not in entry['outputs'] or not os.path.exists(output):
+                return True
+        if entry['size'] != state['size']:
+            return True
+        if entry['mtime_ns'] == state['mtime_ns']:
+            return False
+        if not self.hash or 'hash' not in entry:
+            return True
+
+        # touched but maybe not modified, e.g. copied over again
+        state['hash'] = file_hash(container(source))
+        if entry['hash'] != state['hash']:
+            return True
+        entry.update(state)
+        return False
+
+    def record(self, source, outputs):
+        key = os.path.abspath(source)
+        state = self.pending.pop(key, None)
+        if state is None:
+            stat = os.stat(container(source))
+            state = { 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns }
+        if self.hash and 'hash' not in state:
+            state['hash'] = file_hash(container(source))
+
+        entry = self.entries.get(key, { 'outputs': [] })
+        produced = set(entry['outputs']) | set(map(os.path.abspath, outputs))
+        self.entries[key] = { **state, 'outputs': sorted(produced) }
+
+    def prune(self):
+        """Forget inputs that no longer exist and yield (source, outputs)
+        for each, so the caller may remove what was produced from them."""
+        for key in [ k for k in self.entries
+                     if not os.path.exists(container(k)) ]:
+            yield key, self.entries.pop(key)['outputs']
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w') as fout:
+            json.dump({ 'version': 1, 'entries': self.entries }, fout)
+        os.replace(temporary, self.path)
+
+
+class Manifests:
+    """The manifests of every output directory of a run, each input kept
+    in the manifest of the directory `directory(source)` its outputs go
+    to, e.g. next to the inputs when no output directory is given."""
+
+    def __init__(self, directory, hash=False):
+        self.directory = directory
+        self.hash = hash
+        self.manifests = {}
+
+    def of(self, source):
+        directory = os.path.abspath(self.directory(source))
+        if directory not in self.manifests:
+            self.manifests[directory] = Manifest(directory, self.hash)
+        return self.manifests[directory]
+
+    @property
+    def entries(self):
+        return { key: entry for manifest in self.manifests.values()
+                 for key, entry in manifest.entries.items() }
+
+    def owns(self, source, output):
+        return self.of(source).owns(source, output)
+
+    def changed(self, source, outputs):
+        return self.of(source).changed(source, outputs)
+
+    def record(self, source, outputs):
+        self.of(source).record(source, outputs)
+
+    def prune(self):
+        for manifest in self.manifests.values():
+            yield from manifest.prune()
+
+    def save(self):
+        for manifest in self.manifests.values():
+            manifest.save()
@@ -0,0 +1,57 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+def failed(e):
+    future = Future()
+    future.set_exception(e)
+    return future
+
+
+def pipeline(tasks, read, decode, write, cost, readers=4, capacity=256 << 20,
+             depth=2):
+    """Run every task through three overlapping stages and yield
+    (task, result, error) triples in task order, like run_ordered.
+
+    `read(task)` runs on a pool of `readers` threads that prefetch the
+    upcoming tasks, `decode(task, read)` runs on the calling thread, and
+    `write(task, decoded)` runs on a thread of its own, so reading the
+    next inputs and writing the previous ones both overlap decoding the
+    current one. `write` returns the result. Reads wait while the `cost`
+    in bytes of the tasks between reading and written would exceed
+    `capacity`, at most `depth` decoded tasks wait to be written, and at
+    most twice `readers` reads are queued. One task is always let through
+    so that a task costlier than `capacity` still makes progress."""
+    upcoming = deque(tasks)
+    reading = deque()
+    writing = deque()
+    used = 0
+
+    with ThreadPoolExecutor(readers) as read_pool, \
+         ThreadPoolExecutor(1) as write_pool:
+        while upcoming or reading or writing:
+            # prefetch as far ahead as the memory cap allows
+            while (upcoming and len(reading) < 2 * readers and
+                   (0 == used or used + cost(upcoming[0]) <= capacity)):
+                task = upcoming.popleft()
+                used += cost(task)
+                reading.append((task, read_pool.submit(read, task)))
+
+            if reading and len(writing) < depth:
+                task, future = reading.popleft()
+                try:
+                    decoded = decode(task, future.result())
+                    future = write_pool.submit(write, task, decoded)
+                except Exception as e:
+                    future = failed(e)
+                writing.append((task, future))
+                continue
+
+            task, future = writing.popleft()
+            used -= cost(task)
+            try:
+                result = future.result()
+            except Exception as e:
+                yield task, None, e
+            else:
+                yield task, result, None
@@ -0,0 +1,142 @@
+import os
+import tempfile
+
+import numpy as np
+
+
+STATISTICS = [ 'mean', 'std', 'min', 'max', 'median' ]
+
+# samples per slice of the spilled series when taking the median
+MEDIAN_CHUNK = 256
+
+
+def parse_statistics(text):
+    statistics = [ s.strip().lower() for s in text.split(',') if s.strip() ]
+    for statistic in statistics:
+        if statistic not in STATISTICS:
+            raise ValueError(f'unknown statistic {statistic}')
+    return statistics
+
+
+class Reduce:
+    """Per-wavelength statistics of the series of many frames, updated one
+    frame at a time so that the frames themselves need not be kept: mean
+    and sample standard deviation with Welford's method in double
+    precision, and running minima and maxima. The median needs every
+    value, so for it the series are spilled into a temporary memory map
+    of at most `capacity` frames and reduced a slice of samples at a time.
+    The first column of each frame holds the wavelengths, which must be
+    the same across frames, and the others are reduced, after subtracting
+    those of the `dark` frame if one is given."""
+
+    def __init__(self, statistics, capacity, dark=None):
+        self.statistics = statistics
+        self.capacity = capacity
+        self.dark = dark
+        self.offset = None
+        self.count = 0
+        self.columns = None
+        self.wavelengths = None
+        self.mean = None
+        self.m2 = None
+        self.min = None
+        self.max = None
+        self.spill = None
+        self.spill_path = None
+
+    def start(self, data):
+        series = data.to_numpy()
+        if self.dark is not None:
+            dark = self.dark.to_numpy()
+            if dark.shape != series.shape:
+                raise ValueError(
+                    f'dark frame is {dark.shape}, but the series are {series.shape}')
+            self.offset = dark[:, 1:]
+
+        self.columns = list(data.columns[1:])
+        self.wavelengths = series[:, 0].copy()
+        shape = (series.shape[0], len(self.columns))
+
+        self.mean = np.zeros(shape, dtype=np.float64)
+        self.m2 = np.zeros(shape, dtype=np.float64)
+        self.min = np.full(shape, np.inf, dtype=np.float32)
+        self.max = np.full(shape, -np.inf, dtype=np.float32)
+        if 'median' in self.statistics:
+            fd, self.spill_path = tempfile.mkstemp(suffix='.reduce')
+            os.close(fd)
+            self.spill = np.memmap(self.spill_path, mode='w+',
+                dtype=np.float32, shape=(self.capacity, *shape))
+
+    def append(self, data):
+        if self.mean is None:
+            self.start(data)
+
+        series = data.to_numpy()
+        if series.shape[0] != len(self.wavelengths) or \
+           series.shape[1] != 1 + len(self.columns):
+            raise ValueError(
+                f'reduce expects {(len(self.wavelengths), 1 + len(self.columns))} '
+                f'series, but was {series.shape}')
+        if not np.array_equal(series[:, 0], self.wavelengths):
+            raise ValueError('wavelengths differ from those of the first input')
+        if self.count == self.capacity:
+            raise ValueError(f'reduce is full at {self.capacity} inputs')
+
+        values = series[:, 1:]
+        if self.offset is not None:
+            values = values - self.offset
+
+        self.count += 1
+        delta = values - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (values - self.mean)
+        np.minimum(self.min, values, out=self.min)
+        np.maximum(self.max, values, out=self.max)
+        if self.spill is not None:
+            self.spill[self.count - 1] = values
+
+    def median(self):
+        median = np.empty(self.mean.shape, dtype=np.float32)
+        for start in range(0, median.shape[0], MEDIAN_CHUNK):
+            stop = start + MEDIAN_CHUNK
+            median[start:stop] = np.median(
+                self.spill[:self.count, start:stop], axis=0)
+        return median
+
+    def result(self):
+        """The statistics as a frame of wavelengths followed by a column
+        per reduced column and statistic, or None before any frame."""
+        import pandas as pd
+
+        if self.count == 0:
+            return None
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(self.m2 / (self.count - 1)) if 1 < self.count \
+                  else np.full(self.m2.shape, np.nan)
+        computed = {
+            'mean': lambda: self.mean,
+            'std': lambda: std,
+            'min': lambda: self.min,
+            'max': lambda: self.max,
+            'median': self.median
+        }
+
+        columns = { 'wavelength (nm)': self.wavelengths }
+        values = { s: computed[s]().astype(np.float32) for s in self.statistics }
+        for index, column in enumerate(self.columns):
+            for statistic in self.statistics:
+                columns[f'{column} {statistic}'] = values[statistic][:, index]
+
+        data = pd.DataFrame(columns)
+        data.attrs.update({ 'input_count': self.count,
+                            'statistics': ','.join(self.statistics) })
+        return data
+
+    def close(self):
+        if self.spill is not None:
+            del self.spill
+            self.spill = None
+        if self.spill_path is not None:
+            os.remove(self.spill_path)
+            self.spill_path = None
@@ -0,0 +1,67 @@
+import hashlib
+import os
+
+import numpy as np
+
+
+# per process: target grids by --resample spec, and interpolation weights
+# by source and target grid, which inputs from one spectrometer all share
+grids = {}
+weights = {}
+
+
+def grid(spec, load):
+    """The target wavelengths of a --resample spec: start:stop:step, with
+    stop included when it falls on the grid, or the path of a reference
+    file whose wavelengths `load(path)` returns."""
+    if spec not in grids:
+        parts = spec.split(':')
+        if 3 == len(parts) and not os.path.exists(spec):
+            start, stop, step = map(float, parts)
+            if step <= 0 or stop < start:
+                raise ValueError(f'{spec} is not an increasing start:stop:step')
+            count = int(np.floor((stop - start) / step + 1e-9)) + 1
+            target = start + step * np.arange(count)
+        else:
+            target = np.asarray(load(spec))
+        grids[spec] = np.ascontiguousarray(target, dtype=np.float32)
+    return grids[spec]
+
+
+def interpolation(source, target):
+    """Indices and weights that linearly interpolate values sampled at the
+    increasing `source` wavelengths onto `target`, and a mask of targets
+    outside the source range. Computed once per pair of grids."""
+    key = tuple(hashlib.blake2b(grid.tobytes(), digest_size=16).digest()
+                for grid in (source, target))
+    if key not in weights:
+        index = np.searchsorted(source, target, side='right') - 1
+        index = np.clip(index, 0, max(len(source) - 2, 0))
+        x0 = source[index]
+        x1 = source[np.minimum(index + 1, len(source) - 1)]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            w = np.where(x1 != x0, (target - x0) / (x1 - x0), 0)
+        outside = (target < source[0]) | (source[-1] < target)
+        weights[key] = (index, w.astype(np.float32)[:, None], outside)
+    return weights[key]
+
+
+def resample(series, target):
+    """Resample a (samples, axes) array whose first column holds the
+    wavelengths onto the `target` wavelengths. Every other column is
+    interpolated at once; targets outside the input range become NaN."""
+    source = series[:, 0]
+    values = series[:, 1:]
+    if len(source) < 2:
+        raise ValueError(f'cannot resample {len(source)} samples')
+    if 1 < len(source) and not np.all(source[1:] > source[:-1]):
+        order = np.argsort(source, kind='stable')
+        source, values = source[order], values[order]
+
+    index, w, outside = interpolation(np.ascontiguousarray(source), target)
+    following = np.minimum(index + 1, len(source) - 1)
+    result = np.empty((len(target), series.shape[1]), dtype=np.float32)
+    result[:, 0] = target
+    result[:, 1:] = values[index] + w * (values[following] - values[index])
+    result[outside, 1:] = np.nan
+    return result
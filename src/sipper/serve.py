@@ -0,0 +1,250 @@
+import json
+import os
+import signal
+import socket
+import struct
+import sys
+import threading
+
+
+# frames sent back to the client: kind, payload length, payload; the kinds
+# are stdout and stderr output, and the exit status ending the response
+frame_header = struct.Struct('>cI')
+STDOUT = b'o'
+STDERR = b'e'
+EXIT = b'x'
+
+CHUNK = 1 << 16
+
+
+def supported():
+    return hasattr(socket, 'AF_UNIX') and hasattr(os, 'fork')
+
+
+def alive(path):
+    """Whether a server is accepting connections on the socket at `path`."""
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+def send_frame(connection, lock, kind, payload):
+    with lock:
+        connection.sendall(frame_header.pack(kind, len(payload)) + payload)
+
+
+def relay_output(fd, connection, lock, kind):
+    """Send whatever is written into the pipe `fd` to the client until
+    every writer has closed it."""
+    while True:
+        data = os.read(fd, CHUNK)
+        if not data:
+            break
+        try:
+            send_frame(connection, lock, kind, data)
+        except OSError:
+            # the client is gone, so is anyone to convert for
+            os._exit(1)
+    os.close(fd)
+
+
+def relay_input(reader, fd):
+    """Feed what the client sends after its request into the pipe `fd`."""
+    try:
+        while True:
+            data = reader.read1(CHUNK)
+            if not data:
+                break
+            os.write(fd, data)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def handle(connection, run):
+    """Serve one request in a forked process and exit. The request is a
+    line of JSON with the arguments and working directory of the client,
+    optionally followed by the data for stdin. stdin, stdout and stderr
+    are replaced at the descriptor level with pipes to and from the
+    client, so that worker processes and libraries writing to them
+    directly are relayed as well."""
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    reader = connection.makefile('rb')
+    lock = threading.Lock()
+
+    try:
+        request = json.loads(reader.readline())
+        os.chdir(request['cwd'])
+        argv = [ str(arg) for arg in request['argv'] ]
+    except Exception as e:
+        message = f'error({type(e).__name__}): malformed request: {e}\n'
+        send_frame(connection, lock, STDERR, message.encode())
+        send_frame(connection, lock, EXIT, struct.pack('>i', 2))
+        os._exit(2)
+
+    stdin_read, stdin_write = os.pipe()
+    os.dup2(stdin_read, 0)
+    os.close(stdin_read)
+    threading.Thread(target=relay_input, args=(reader, stdin_write),
+                     daemon=True).start()
+
+    relays = []
+    for fd, kind in ((1, STDOUT), (2, STDERR)):
+        read, write = os.pipe()
+        os.dup2(write, fd)
+        os.close(write)
+        relay = threading.Thread(target=relay_output,
+                                 args=(read, connection, lock, kind))
+        relay.start()
+        relays.append(relay)
+
+    sys.stdin = sys.__stdin__ = open(0, 'r', closefd=False)
+    sys.stdout = sys.__stdout__ = open(1, 'w', closefd=False)
+    sys.stderr = sys.__stderr__ = open(2, 'w', buffering=1, closefd=False)
+    sys.argv = [ 'sipper' ] + argv
+
+    status = 0
+    try:
+        run()
+    except SystemExit as e:
+        if isinstance(e.code, int):
+            status = e.code
+        elif e.code is not None:
+            sys.stderr.write(f'{e.code}\n')
+            status = 1
+    except BaseException:
+        import traceback
+        traceback.print_exc()
+        status = 1
+
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except Exception:
+            pass
+    os.close(1)
+    os.close(2)
+    for relay in relays:
+        relay.join()
+
+    try:
+        send_frame(connection, lock, EXIT, struct.pack('>i', status))
+        connection.close()
+    except OSError:
+        pass
+    os._exit(status)
+
+
+def reap(children, block):
+    """Forget the children that have exited, waiting for one if `block`."""
+    while children:
+        pid, _ = os.waitpid(-1, 0 if block else os.WNOHANG)
+        if 0 == pid:
+            return
+        children.discard(pid)
+        block = False
+
+
+def serve(path, jobs, run, ready=None):
+    """Accept requests on a Unix domain socket at `path` and serve each
+    in a process forked from this one, at most `jobs` at a time, by
+    calling `run()` in it. Whatever was imported before serving, pandas
+    and the drivers above all, is thus imported once and for all, and
+    each request starts off warm. Runs until interrupted or terminated,
+    then removes the socket."""
+    if os.path.exists(path):
+        if alive(path):
+            raise FileExistsError(f'{path} is already being served')
+        os.remove(path)
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    # only the owner may connect
+    umask = os.umask(0o177)
+    try:
+        server.bind(path)
+    finally:
+        os.umask(umask)
+    server.listen(64)
+    # accept wakes up now and then to collect finished children
+    server.settimeout(1.0)
+
+    def terminate(signum, frame):
+        raise SystemExit(0)
+    signal.signal(signal.SIGTERM, terminate)
+
+    children = set()
+    try:
+        if ready is not None:
+            ready()
+        while True:
+            reap(children, block=jobs <= len(children))
+            try:
+                connection, _ = server.accept()
+            except socket.timeout:
+                continue
+            connection.settimeout(None)
+
+            # anything buffered would otherwise be written by the child too
+            sys.stdout.flush()
+            sys.stderr.flush()
+            pid = os.fork()
+            if 0 == pid:
+                server.close()
+                handle(connection, run)
+            connection.close()
+            children.add(pid)
+    finally:
+        server.close()
+        os.remove(path)
+
+
+def connect(path, argv, stdin=False):
+    """Send a request with the arguments `argv` to the server at `path`,
+    forwarding stdin if `stdin`, write out its output as it arrives and
+    return its exit status."""
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.connect(path)
+    request = { 'argv': argv, 'cwd': os.getcwd() }
+    client.sendall(json.dumps(request).encode() + b'\n')
+
+    def forward():
+        try:
+            while True:
+                data = sys.stdin.buffer.read1(CHUNK)
+                if not data:
+                    break
+                client.sendall(data)
+            client.shutdown(socket.SHUT_WR)
+        except OSError:
+            pass
+
+    if stdin:
+        # the server may be done before stdin is
+        threading.Thread(target=forward, daemon=True).start()
+    else:
+        client.shutdown(socket.SHUT_WR)
+
+    reader = client.makefile('rb')
+    streams = { STDOUT: sys.stdout.buffer, STDERR: sys.stderr.buffer }
+    try:
+        while True:
+            header = reader.read(frame_header.size)
+            if len(header) < frame_header.size:
+                raise ConnectionError('the server closed the connection')
+            kind, size = frame_header.unpack(header)
+            payload = reader.read(size)
+            if EXIT == kind:
+                return struct.unpack('>i', payload)[0]
+            streams[kind].write(payload)
+            if STDERR == kind:
+                streams[kind].flush()
+    finally:
+        sys.stdout.flush()
+        client.close()
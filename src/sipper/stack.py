@@ -0,0 +1,82 @@
+import csv
+
+import numpy as np
+from numpy.lib import format as npformat
+
+
+class Stack:
+    """Stacks the series of many frames into a single files x axes x
+    samples .npy cube, written incrementally through a memory map, with
+    a CSV side table mapping each row to its source path and header
+    properties."""
+
+    def __init__(self, path, capacity):
+        self.path = path
+        self.capacity = capacity
+        self.count = 0
+        self.cube = None
+        self.table = None
+        self.writer = None
+
+    def index_path(self):
+        split = self.path.split('.')
+        if 1 < len(split):
+            return '.'.join(split[:-1]) + '.index.csv'
+        return self.path + '.index.csv'
+
+    def append(self, source, data):
+        # (axes, samples), the layout of the series in the input file
+        series = data.to_numpy().T
+        if self.cube is None:
+            self.cube = npformat.open_memmap(self.path, mode='w+',
+                dtype=np.float32, shape=(self.capacity, *series.shape))
+            self.table = open(self.index_path(), 'w', newline='')
+            self.writer = csv.DictWriter(self.table,
+                [ 'row', 'path', *data.attrs.keys() ],
+                extrasaction='ignore')
+            self.writer.writeheader()
+
+        if series.shape != self.cube.shape[1:]:
+            raise ValueError(
+                f'stack expects {self.cube.shape[1:]} series, but was {series.shape}')
+        if self.count == self.capacity:
+            raise ValueError(f'stack is full at {self.capacity} rows')
+
+        self.cube[self.count] = series
+        self.writer.writerow({ 'row': self.count, 'path': source, **data.attrs })
+        self.count += 1
+
+    def close(self):
+        if self.cube is None:
+            return
+        self.cube.flush()
+        del self.cube
+        self.cube = None
+        self.table.close()
+        if self.count < self.capacity:
+            shrink(self.path, self.count)
+
+
+def shrink(path, rows):
+    """Truncate the .npy array at `path` to its first `rows` rows in
+    place, rewriting the header within its original length."""
+    with open(path, 'r+b') as f:
+        version = npformat.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = npformat.read_array_header_1_0(f)
+            prefix = 10
+        else:
+            shape, fortran_order, dtype = npformat.read_array_header_2_0(f)
+            prefix = 12
+        offset = f.tell()
+
+        shape = (rows, *shape[1:])
+        header = repr({
+            'descr': npformat.dtype_to_descr(dtype),
+            'fortran_order': fortran_order,
+            'shape': shape
+        })
+        # fewer rows never needs more digits, so the header still fits
+        f.seek(prefix)
+        f.write((header.ljust(offset - prefix - 1) + '\n').encode('latin1'))
+        f.truncate(offset + dtype.itemsize * int(np.prod(shape)))
@@ -0,0 +1,128 @@
+import json
+import time
+from contextlib import contextmanager
+
+
+# in the order a file passes through them
+STAGES = [ 'open', 'header', 'series', 'frame', 'write' ]
+
+
+def peak_rss():
+    """Peak resident set size in bytes of this process and of its largest
+    finished child, e.g. a -j worker, or None where it is unknown."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    import sys
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    scale = 1 if 'darwin' == sys.platform else 1024
+    return scale * max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                       resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+
+
+class Stats:
+    """Seconds spent in each stage along with the bytes read and written,
+    for a single input or summed over many. Plain enough to be returned
+    from a -j worker."""
+
+    def __init__(self):
+        self.seconds = dict.fromkeys(STAGES, 0.0)
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += time.perf_counter() - start
+
+    def add(self, other):
+        for name, seconds in other.seconds.items():
+            self.seconds[name] += seconds
+        self.bytes_read += other.bytes_read
+        self.bytes_written += other.bytes_written
+
+    def to_dict(self):
+        return {
+            'seconds': dict(self.seconds),
+            'bytes_read': self.bytes_read,
+            'bytes_written': self.bytes_written
+        }
+
+    def __str__(self):
+        stages = ', '.join(f'{name} {seconds * 1000:.2f} ms'
+                           for name, seconds in self.seconds.items())
+        return (f'{stages}; read {self.bytes_read} B, '
+                f'wrote {self.bytes_written} B')
+
+
+def excluding(stats, name, iterable):
+    """Yield from `iterable`, taking the time spent producing each item
+    back out of stage `name` of `stats`. A consumer timed as a whole then
+    only accounts for its own work, not that of its producers."""
+    iterator = iter(iterable)
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            stats.seconds[name] -= time.perf_counter() - start
+        yield item
+
+
+class Report:
+    """Collects the Stats of every converted input and of the coalesced
+    outputs, and summarizes them over the wall time of the whole run."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.files = []
+        self.coalesced = Stats()
+
+    def add(self, input, stats):
+        self.files.append((input, stats))
+
+    def summary(self):
+        wall = time.perf_counter() - self.start
+        count = len(self.files)
+        total = Stats()
+        for _, stats in self.files:
+            total.add(stats)
+        total.add(self.coalesced)
+        return {
+            'files': count,
+            'wall_seconds': wall,
+            'files_per_second': count / wall if wall else 0.0,
+            'read_mb_per_second': total.bytes_read / 1e6 / wall if wall else 0.0,
+            'peak_rss_bytes': peak_rss(),
+            **total.to_dict()
+        }
+
+    def print(self):
+        summary = self.summary()
+        count = max(summary['files'], 1)
+        print(f'stats: {summary["files"]} file(s) in '
+              f'{summary["wall_seconds"]:.3f} s, '
+              f'{summary["files_per_second"]:.1f} files/s, '
+              f'{summary["read_mb_per_second"]:.1f} MB/s read')
+        for name, seconds in summary['seconds'].items():
+            print(f'\t{name}: {seconds:.3f} s total, '
+                  f'{seconds / count * 1000:.2f} ms per file')
+        print(f'\tread: {summary["bytes_read"]} B')
+        print(f'\twritten: {summary["bytes_written"]} B')
+        if summary['peak_rss_bytes'] is not None:
+            print(f'\tpeak rss: {summary["peak_rss_bytes"] / 1e6:.1f} MB')
+
+    def save(self, path):
+        with open(path, 'w') as fout:
+            json.dump({
+                'files': [ { 'input': input, **stats.to_dict() }
+                           for input, stats in self.files ],
+                'coalesced': self.coalesced.to_dict(),
+                'total': self.summary()
+            }, fout, indent=2)
@@ -0,0 +1,117 @@
+import os
+from itertools import islice
+
+from sipper.archive import SEPARATOR, expand, is_archive, open_member
+from sipper.driver.avs84 import HEADER, recognized
+
+
+# paths handed to the thread pool at once, bounding the futures in flight
+BATCH = 1024
+
+
+def failed(path, e):
+    return { 'path': path, 'status': 'error',
+             'error': f'{type(e).__name__}: {e}' }
+
+
+def scan(paths, archive=None):
+    """Yield the .raw8 files under each directory in `paths`, recursively,
+    the members of archives, and any other path as it is. Directories and
+    archives that cannot be read are yielded as error records. Archives
+    are expanded by `archive(path)`, scan_archive by default."""
+    archive = archive or scan_archive
+    for path in paths:
+        if os.path.isdir(path):
+            yield from scan_directory(path, archive)
+        elif is_archive(path) or SEPARATOR in path:
+            yield from archive(path)
+        else:
+            yield path
+
+
+def scan_archive(path):
+    try:
+        members = expand(path)
+    except Exception as e:
+        members = [ failed(path, e) ]
+    yield from members
+
+
+def scan_directory(directory, archive=scan_archive):
+    try:
+        with os.scandir(directory) as entries:
+            entries = sorted(entries, key=lambda entry: entry.name)
+    except OSError as e:
+        yield failed(directory, e)
+        return
+
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from scan_directory(entry.path, archive)
+        elif entry.name.lower().endswith('.raw8'):
+            yield entry.path
+        elif is_archive(entry.name):
+            yield from archive(entry.path)
+
+
+def read_head(path):
+    """Read the header bytes and the size of a file or archive member."""
+    if SEPARATOR in path:
+        with open_member(path) as member:
+            return member.read(HEADER.size), member.seek(0, os.SEEK_END)
+
+    # unbuffered, so that only the header is read
+    with open(path, 'rb', buffering=0) as fin:
+        return fin.read(HEADER.size), os.fstat(fin.fileno()).st_size
+
+
+def check(path, depth):
+    """Check the header of an AVS84 file against the criteria of
+    read_avs84_header and its size against the `depth` its series end
+    at. Returns a record with the status: good, truncated when the series
+    are cut short, unrecognized, or error when the file cannot be read."""
+    # scan already failed on it
+    if isinstance(path, dict):
+        return path
+
+    record = { 'path': path, 'status': 'good' }
+    try:
+        head, size = read_head(path)
+    except Exception as e:
+        return failed(path, e)
+
+    record['size'] = size
+    # the depth the status is judged against, which the footer follows
+    record['series_depth'] = depth
+    record['status'], header = classify(head, size, depth)
+    if header is not None:
+        record['spectrometer_serial'] = header['spectrometer_serial']
+    return record
+
+
+def classify(head, size, depth):
+    """The status of a file given its header bytes and size, and the
+    decoded header, or None if the file is too short to hold one."""
+    if len(head) < HEADER.size:
+        return 'unrecognized', None
+
+    header = HEADER.unpack(head)
+    if not recognized(header, len(head)):
+        return 'unrecognized', header
+    if size < depth:
+        return 'truncated', header
+    return 'good', header
+
+
+def verify(paths, depth, threads):
+    """Check every file found in `paths` on `threads` threads and yield
+    the records in scan order."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    found = scan(paths)
+    with ThreadPoolExecutor(threads) as executor:
+        while True:
+            batch = list(islice(found, BATCH))
+            if not batch:
+                return
+            yield from executor.map(check, batch, [ depth ] * len(batch))
@@ -0,0 +1,129 @@
+import os
+import select
+import struct
+import time
+
+
+# inotify(7) event masks
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+
+# struct inotify_event without its trailing name
+event_header = struct.Struct('iIII')
+
+
+def inotify(directory):
+    """Return an inotify descriptor watching `directory` for written and
+    moved in files, or None where inotify is unavailable."""
+    try:
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        fd = libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+
+    mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+    if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+
+def read_events(fd):
+    """Return the names of files with events along with the names of
+    those closed after writing or moved in, i.e. no longer written."""
+    names = set()
+    closed = set()
+    try:
+        buffer = os.read(fd, 1 << 16)
+    except BlockingIOError:
+        return names, closed
+
+    offset = 0
+    while offset < len(buffer):
+        _, mask, _, length = event_header.unpack_from(buffer, offset)
+        offset += event_header.size
+        name = os.fsdecode(buffer[offset:offset + length].rstrip(b'\0'))
+        offset += length
+        if not name:
+            continue
+        names.add(name)
+        if mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+            closed.add(name)
+        else:
+            closed.discard(name)
+    return names, closed
+
+
+def scan(directory, accept):
+    with os.scandir(directory) as entries:
+        return { entry.name: (entry.stat().st_size, entry.stat().st_mtime_ns)
+                 for entry in entries
+                 if entry.is_file() and accept(entry.name) }
+
+
+def watch(directory, accept, complete, interval=1.0, poll=False):
+    """Yield batches of paths to files in `directory` whose names pass
+    `accept` once `complete(path)` holds, i.e. once they have been fully
+    written and is no longer being written to: closed after writing as
+    reported by inotify, or unchanged for one `interval` when polling.
+    Files complete when watching starts are left alone, and a file is
+    yielded again only if it is rewritten. Uses inotify where available
+    and polls the directory every `interval` seconds otherwise. Runs
+    until interrupted."""
+    fd = None if poll else inotify(directory)
+
+    # files present at start are done unless still being written
+    seen = scan(directory, accept)
+    pending = { name for name in seen
+                if not complete(os.path.join(directory, name)) }
+    done = { name: state for name, state in seen.items()
+             if name not in pending }
+    closed = set()
+
+    try:
+        while True:
+            if fd is not None:
+                readable, _, _ = select.select([ fd ], [], [], interval)
+                if readable:
+                    names, names_closed = read_events(fd)
+                    pending |= { name for name in names if accept(name) }
+                    closed -= names
+                    closed |= names_closed
+            else:
+                time.sleep(interval)
+                current = scan(directory, accept)
+                pending |= { name for name, state in current.items()
+                             if done.get(name) != state }
+
+            ready = []
+            for name in sorted(pending):
+                path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    pending.discard(name)
+                    continue
+                state = (stat.st_size, stat.st_mtime_ns)
+                if done.get(name) == state:
+                    pending.discard(name)
+                    continue
+
+                settled = name in closed or seen.get(name) == state
+                seen[name] = state
+                if settled and complete(path):
+                    pending.discard(name)
+                    closed.discard(name)
+                    done[name] = state
+                    ready.append(path)
+
+            if ready:
+                yield ready
+    finally:
+        if fd is not None:
+            os.close(fd)
@@ -0,0 +1,53 @@
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sipper.driver import Data, DataType
+from sipper.driver.avs84 import AVS84Driver
+
+
+def make_frame(samples=3400, axes=3, seed=0, start=200.0, serial='SIPPER000'):
+    """A frame shaped like a decoded .raw8 file: increasing wavelengths
+    followed by random single precision series."""
+    rng = np.random.default_rng(seed)
+    series = rng.random((samples, axes), dtype=np.float32)
+    series[:, 0] = start + np.arange(samples, dtype=np.float32) * 0.25
+    labels = [ 'wavelength (nm)', 'y', 'z' ][:axes]
+    data = pd.DataFrame(series, columns=labels)
+    data.attrs['spectrometer_serial'] = serial
+    return data
+
+
+def write_raw8(path, data):
+    with open(path, 'wb') as fout:
+        AVS84Driver().write(None, [ Data(path.stem, DataType.FRAME, data) ], fout)
+    return path
+
+
+@pytest.fixture
+def raw8(tmp_path):
+    """Write frames as .raw8 files into a temporary directory."""
+    def write(name='a.raw8', **options):
+        return write_raw8(tmp_path / name, make_frame(**options))
+    return write
+
+
+@pytest.fixture
+def sipper(tmp_path, monkeypatch):
+    """Run the command line in a temporary directory and return its exit
+    status."""
+    from sipper.__main__ import main
+
+    monkeypatch.chdir(tmp_path)
+    # main points stdout at stderr when writing data to stdout
+    monkeypatch.setattr(sys, 'stdout', sys.stdout)
+    def run(*argv):
+        monkeypatch.setattr(sys, 'argv', [ 'sipper', *argv ])
+        try:
+            main()
+        except SystemExit as e:
+            return e.code or 0
+        return 0
+    return run
@@ -0,0 +1,48 @@
+import tarfile
+import zipfile
+
+import pytest
+
+from sipper.archive import (SEPARATOR, container, expand, is_streamed,
+                            open_member, split)
+
+
+@pytest.fixture(params=[ 'set.zip', 'set.tar', 'set.tar.gz' ])
+def archive(request, tmp_path):
+    files = { 'run/a.raw8': b'a' * 100, 'run/b.raw8': b'b' * 50,
+              'notes.txt': b'text' }
+    path = tmp_path / request.param
+    if path.name.endswith('.zip'):
+        with zipfile.ZipFile(path, 'w') as fout:
+            for name, data in files.items():
+                fout.writestr(name, data)
+    else:
+        for name, data in files.items():
+            (tmp_path / name).parent.mkdir(exist_ok=True)
+            (tmp_path / name).write_bytes(data)
+        with tarfile.open(path, 'w:gz' if path.name.endswith('.gz') else 'w') as fout:
+            for name in files:
+                fout.add(tmp_path / name, name)
+    return str(path), files
+
+
+def test_expand_and_open_members(archive):
+    path, files = archive
+    members = expand(path)
+    assert [ path + SEPARATOR + 'run/a.raw8', path + SEPARATOR + 'run/b.raw8' ] \
+           == members
+    assert [ path + SEPARATOR + 'notes.txt' ] == expand(path + SEPARATOR + '*.txt')
+    for member in members + [ path + SEPARATOR + 'notes.txt' ]:
+        with open_member(member) as fin:
+            assert files[split(member)[1]] == fin.read()
+    with pytest.raises(FileNotFoundError):
+        open_member(path + SEPARATOR + 'missing.raw8')
+
+
+def test_split():
+    assert ('a.zip', 'x/b.raw8') == split('a.zip::x/b.raw8')
+    assert ('a.raw8', None) == split('a.raw8')
+    assert ('notes::b', None) == split('notes::b')
+    assert 'a.tgz' == container('a.tgz::b.raw8')
+    assert is_streamed('a.tar.gz::b.raw8')
+    assert not is_streamed('a.tar::b.raw8') and not is_streamed('a.tar.gz')
@@ -0,0 +1,68 @@
+import os
+import zipfile
+
+import pytest
+
+from sipper.archive import SEPARATOR
+from sipper.catalog import Catalog, select
+
+from conftest import make_frame, write_raw8
+
+
+SHAPE = (3400, 3)
+
+
+def index(catalog, root):
+    with Catalog(str(catalog)) as opened:
+        counts, errors = opened.index([ str(root) ], SHAPE, 2)
+    assert [] == errors
+    return counts
+
+
+def test_index_is_incremental(tmp_path):
+    root = tmp_path / 'data'
+    root.mkdir()
+    catalog = tmp_path / 'catalog.db'
+    for name, serial in [ ('a', 'SERIAL001'), ('b', 'SERIAL001'), ('c', 'SERIAL002') ]:
+        write_raw8(root / f'{name}.raw8', make_frame(serial=serial))
+
+    assert { 'indexed': 3, 'unchanged': 0, 'removed': 0 } == index(catalog, root)
+    assert { 'indexed': 0, 'unchanged': 3, 'removed': 0 } == index(catalog, root)
+
+    write_raw8(root / 'a.raw8', make_frame(serial='SERIAL002'))
+    stat = os.stat(root / 'a.raw8')
+    os.utime(root / 'a.raw8', ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    os.remove(root / 'b.raw8')
+    assert { 'indexed': 1, 'unchanged': 1, 'removed': 1 } == index(catalog, root)
+
+    assert [ str(root / 'a.raw8'), str(root / 'c.raw8') ] == \
+           select(str(catalog), "spectrometer_serial = 'SERIAL002'")
+
+
+def test_select_skips_bad_files(tmp_path):
+    root = tmp_path / 'data'
+    root.mkdir()
+    catalog = tmp_path / 'catalog.db'
+    write_raw8(root / 'good.raw8', make_frame())
+    data = (root / 'good.raw8').read_bytes()
+    (root / 'short.raw8').write_bytes(data[:1000])
+    (root / 'other.raw8').write_bytes(b'not a spectrum')
+
+    assert 3 == index(catalog, root)['indexed']
+    assert [ str(root / 'good.raw8') ] == select(str(catalog))
+    with pytest.raises(FileNotFoundError):
+        select(str(tmp_path / 'missing.db'))
+
+
+def test_unchanged_archives_are_not_listed_again(tmp_path):
+    root = tmp_path / 'data'
+    root.mkdir()
+    catalog = tmp_path / 'catalog.db'
+    write_raw8(tmp_path / 'a.raw8', make_frame(serial='SERIAL003'))
+    with zipfile.ZipFile(root / 'set.zip', 'w') as archive:
+        archive.write(tmp_path / 'a.raw8', 'x/a.raw8')
+
+    assert 1 == index(catalog, root)['indexed']
+    assert { 'indexed': 0, 'unchanged': 1, 'removed': 0 } == index(catalog, root)
+    assert [ str(root / 'set.zip') + SEPARATOR + 'x/a.raw8' ] == \
+           select(str(catalog), "spectrometer_serial = 'SERIAL003'")
@@ -0,0 +1,52 @@
+import gzip
+import io
+import lzma
+
+import pytest
+
+from sipper.compress import compressed, inferred, strip_suffix, with_suffix
+
+
+def test_inferred_from_suffix():
+    assert 'gzip' == inferred('a.csv.GZ')
+    assert 'zstd' == inferred('a.npy.zst')
+    assert inferred('a.csv') is None
+    assert 'a.csv' == strip_suffix('a.csv.xz')
+    assert 'a.csv' == strip_suffix('a.csv')
+    assert 'a.csv.gz' == with_suffix('a.csv', 'gzip')
+    assert 'a.csv.xz' == with_suffix('a.csv.xz', 'gzip')
+    assert 'a.csv' == with_suffix('a.csv', None)
+
+
+@pytest.mark.parametrize('compression, decompress', [
+    ('gzip', gzip.decompress), ('xz', lzma.decompress) ])
+def test_round_trip_leaves_raw_open(compression, decompress):
+    raw = io.BytesIO()
+    with compressed(raw, compression, text=True) as fout:
+        fout.write('wavelength,y\n200.0,1.5\n')
+    assert not raw.closed
+    assert b'wavelength,y\n200.0,1.5\n' == decompress(raw.getvalue())
+
+
+def test_gzip_output_is_reproducible():
+    def compress():
+        raw = io.BytesIO()
+        with compressed(raw, 'gzip', text=False) as fout:
+            fout.write(b'\0' * 1000)
+        return raw.getvalue()
+    assert compress() == compress()
+
+
+def test_zstd_round_trip():
+    zstandard = pytest.importorskip('zstandard')
+    raw = io.BytesIO()
+    with compressed(raw, 'zstd', text=False) as fout:
+        fout.write(b'series' * 100)
+    assert b'series' * 100 == \
+           zstandard.ZstdDecompressor().decompressobj().decompress(raw.getvalue())
+
+
+def test_unknown_compression():
+    with pytest.raises(ValueError):
+        with compressed(io.BytesIO(), 'brotli', text=False):
+            pass
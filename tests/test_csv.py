@@ -0,0 +1,74 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sipper import Parcel
+from sipper.driver import Data, DataType
+from sipper.driver.csv import CSVDriver, format_rows
+
+from conftest import make_frame
+
+
+def written(data, **options):
+    handle = io.StringIO()
+    CSVDriver().write(Parcel(**options), [ Data('a', DataType.FRAME, data) ],
+                      handle)
+    return handle.getvalue()
+
+
+@pytest.fixture
+def data():
+    # more rows than a chunk, so the chunks must line up
+    return make_frame(samples=5000)
+
+
+@pytest.fixture
+def holes(data):
+    data = data.copy()
+    data.iloc[[ 0, 17, 4999 ], 1] = np.nan
+    data.iloc[4100, 2] = np.nan
+    return data
+
+
+@pytest.mark.parametrize('frame', [ 'data', 'holes' ])
+@pytest.mark.parametrize('write_index', [ False, True ])
+@pytest.mark.parametrize('write_header', [ False, True ])
+def test_matches_to_csv(request, frame, write_index, write_header):
+    data = request.getfixturevalue(frame)
+    data.index = data.index + 10
+    expected = data.to_csv(float_format='%.6g', index=write_index,
+                           header=write_header, lineterminator='\n')
+    assert expected == written(data, float_format='%.6g',
+                               write_index=write_index,
+                               write_header=write_header)
+
+
+@pytest.mark.parametrize('frame', [ 'data', 'holes' ])
+def test_default_format_round_trips_float32(request, frame):
+    data = request.getfixturevalue(frame)
+    text = written(data, write_header=True)
+    read = pd.read_csv(io.StringIO(text), dtype=np.float32)
+    np.testing.assert_array_equal(data.to_numpy(), read.to_numpy())
+    assert list(data.columns) == list(read.columns)
+
+
+def test_both_paths_agree():
+    block = np.array([ [ 1.5, 2.25 ], [ -3.0, 1e-7 ] ], dtype=np.float32)
+    index = np.array([ 7, 8 ])
+    # the printf path, and the per-cell one taken for blocks with NaN
+    fast = format_rows(block, '%.3g', index)
+    block[1, 1] = np.nan
+    slow = format_rows(block, '%.3g', index)
+    assert '7,1.5,2.25\n8,-3,1e-07\n' == fast
+    assert '7,1.5,2.25\n8,-3,\n' == slow
+
+
+def test_framed_records():
+    data = make_frame(samples=3)
+    text = written(data, write_header=True, framed=True)
+    lines = text.splitlines()
+    assert '#frame\ta\t4' == lines[0]
+    assert 'wavelength (nm),y,z' == lines[1]
+    assert 5 == len(lines)
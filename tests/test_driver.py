@@ -0,0 +1,60 @@
+import subprocess
+import sys
+from importlib import import_module
+
+import pytest
+
+from sipper import driver
+from sipper.driver import detect, drivers, find_driver, head_size, index_signatures
+from sipper.driver.avs84 import AVS84Driver
+
+
+def declared():
+    for name, aliases, module, cls, signatures in drivers:
+        try:
+            yield name, aliases, getattr(import_module(module), cls), signatures
+        except ImportError:
+            continue
+
+
+@pytest.mark.parametrize('name, aliases, cls, signatures', list(declared()))
+def test_table_matches_driver_class(name, aliases, cls, signatures):
+    assert name == cls().name()
+    assert aliases == cls().aliases()
+    assert list(cls.signatures) == signatures
+
+
+def test_signature_index_matches_table():
+    indexed = { (offset, magic, name)
+                for offset, lengths in index_signatures()
+                for _, magics in lengths
+                for magic, name in magics.items() }
+    assert indexed == { (offset, magic, name)
+                        for name, *_, signatures in drivers
+                        for offset, magic in signatures }
+    assert head_size() == max(offset + len(magic)
+                              for *_, signatures in drivers
+                              for offset, magic in signatures)
+
+
+def test_signature_index_is_lazy(monkeypatch):
+    monkeypatch.setattr(driver, 'signature_index', None)
+    monkeypatch.setattr(driver, 'signature_depth', 0)
+    assert 0 < head_size()
+    assert driver.signature_index is not None
+
+
+def test_detection_imports_no_driver():
+    code = ('import sys; from sipper.driver import detect; '
+            'detect(b"AVS84"); '
+            'print(",".join(m for m in sys.modules if m.startswith("sipper.driver.")))')
+    loaded = subprocess.run([ sys.executable, '-c', code ], check=True,
+                            capture_output=True, text=True).stdout.strip()
+    assert '' == loaded
+
+
+def test_detect():
+    assert 'avs84' == detect(b'AVS84' + b'\0' * 8)
+    assert detect(b'xx') is None
+    assert isinstance(find_driver(head=b'AVS84\0'), AVS84Driver)
+    assert find_driver(head=b'PK\3\4') is None
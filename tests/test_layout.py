@@ -0,0 +1,67 @@
+import io
+
+import numpy as np
+import pytest
+
+from sipper import Parcel
+from sipper.driver import Data, DataType
+from sipper.driver.avs84 import FOOTER, HEADER, AVS84Driver
+from sipper.driver.layout import Field, Layout
+
+from conftest import make_frame
+
+
+RECORD = Layout([
+    Field('tag'   , 0x00, 'ascii', 4),
+    Field(None    , 0x04, 'block', 2),
+    Field('count' , 0x06, 'u16'  , 2),
+    Field('values', 0x08, 'f32'  , 8),
+    Field('raw'   , 0x10, 'block', 3)
+])
+
+
+def test_pack_unpack_round_trip():
+    record = { 'tag': 'ABCD', 'count': 7, 'values': (1.5, -2.0), 'raw': b'xyz' }
+    buffer = RECORD.pack(record)
+    assert RECORD.size == len(buffer)
+    assert record == RECORD.unpack(buffer)
+
+
+def test_pack_zero_fills_missing_and_unnamed_fields():
+    buffer = RECORD.pack({ 'tag': 'AB' })
+    assert b'AB\0\0' == buffer[:4]
+    assert b'\0' * (RECORD.size - 4) == buffer[4:]
+
+
+def test_unpack_many_views_consecutive_records():
+    records = [ { 'tag': f'R{i:03d}', 'count': i, 'values': (i, i / 2),
+                  'raw': b'abc' } for i in range(5) ]
+    buffer = b''.join(map(RECORD.pack, records))
+    many = RECORD.unpack_many(buffer)
+    assert 5 == len(many)
+    assert [ r['count'] for r in records ] == many['count'].tolist()
+    np.testing.assert_array_equal(
+        [ r['values'] for r in records ], many['values'])
+    assert b'R004' == many['tag'][4]
+
+
+def test_read_returns_none_on_short_input():
+    assert RECORD.read(io.BytesIO(b'\0' * (RECORD.size - 1))) is None
+
+
+def test_overlapping_fields_are_rejected():
+    with pytest.raises(ValueError):
+        Layout([ Field('a', 0, 'u32', 4), Field('b', 2, 'u16', 2) ])
+
+
+def test_avs84_write_read_round_trip():
+    data = make_frame(samples=3400, axes=3)
+    buffer = io.BytesIO()
+    AVS84Driver().write(None, [ Data('a', DataType.FRAME, data) ], buffer)
+    assert HEADER.size + data.size * 4 + len(FOOTER) == len(buffer.getvalue())
+
+    buffer.seek(0)
+    info = AVS84Driver().read(Parcel(), buffer)
+    assert info.recognized
+    assert 'SIPPER000' == info.properties['spectrometer_serial']
+    np.testing.assert_array_equal(data.to_numpy(), info.data[0].object.to_numpy())
@@ -0,0 +1,78 @@
+import gzip
+import io
+import os
+import sys
+import zipfile
+
+import pytest
+
+
+def test_book_goes_into_a_new_output_directory(tmp_path, raw8, sipper, capsys):
+    raw8('a.raw8')
+    raw8('b.raw8')
+    sipper('-x', '-X', '-c', '-o', 'out', 'a.raw8', 'b.raw8')
+
+    assert 'error' not in capsys.readouterr().err
+    assert os.path.isdir(tmp_path / 'out')
+    assert sorted(os.listdir(tmp_path / 'out')) == \
+           [ 'a.csv', 'a.xlsx', 'b.csv', 'b.xlsx', 'out.xlsx' ]
+
+
+def test_empty_path_list_on_stdin(sipper, monkeypatch, capsys):
+    monkeypatch.setattr(sys, 'stdin', io.TextIOWrapper(io.BytesIO(b'\n')))
+    sipper('-X', '-o', 'e.xlsx', '-')
+    assert 'no input files specified' in capsys.readouterr().err
+
+
+@pytest.mark.parametrize('argv', [
+    ('-X', '-o', 'e.xlsx', 'a.zip::nomatch*'),
+    ('--reduce', 'mean', 'a.zip::zz*'),
+    ('--reduce', 'mean', 'bad.zip') ])
+def test_archives_without_inputs(tmp_path, raw8, sipper, capsys, argv):
+    with zipfile.ZipFile(tmp_path / 'a.zip', 'w') as archive:
+        archive.write(raw8('a.raw8'), 'a.raw8')
+    (tmp_path / 'bad.zip').write_bytes(b'not an archive')
+    sipper(*argv)
+    assert 'no input files specified' in capsys.readouterr().err
+
+
+def test_compress_applies_to_an_output_file(tmp_path, raw8, sipper, capsys):
+    raw8('a.raw8')
+    sipper('-c', '--compress', 'gzip', '-o', 'out.csv', 'a.raw8')
+    with gzip.open(tmp_path / 'out.csv.gz', 'rt') as fin:
+        assert 3400 == len(fin.read().splitlines())
+    assert not os.path.exists(tmp_path / 'out.csv')
+
+    sipper('-c', '--compress', 'gzip', '-o', 'out.csv.xz', 'a.raw8')
+    assert 'compressed with xz, not gzip' in capsys.readouterr().err
+    assert not os.path.exists(tmp_path / 'out.csv.xz')
+
+
+@pytest.mark.parametrize('argv', [
+    ('a.raw8', '--float-format'),
+    ('--float-format', 'six', 'a.raw8'),
+    ('--float-format', '%f %f', 'a.raw8') ])
+def test_float_format_is_validated(tmp_path, raw8, sipper, capsys, argv):
+    raw8('a.raw8')
+    sipper('-c', *argv)
+    err = capsys.readouterr().err
+    assert 'use: --float-format' in err
+    assert 1 == err.count('error')
+    assert not os.path.exists(tmp_path / 'a.csv')
+
+
+@pytest.mark.parametrize('argv, output', [
+    (('-X', '-o', 'sub/e.xlsx'), 'sub/e.xlsx'),
+    (('--stack', 'sub/cube.npy'), 'sub/cube.npy'),
+    (('--reduce', 'mean', '-o', 'sub/r.csv'), 'sub/r.csv') ])
+def test_single_output_files(tmp_path, raw8, sipper, capsys, argv, output):
+    raw8('a.raw8')
+    raw8('b.raw8')
+    sipper(*argv, 'a.raw8', 'b.raw8')
+    assert os.path.isfile(tmp_path / output)
+    capsys.readouterr()
+
+    sipper(*argv, 'a.raw8', 'b.raw8')
+    assert f'error: {output} already exists' in capsys.readouterr().err
+    sipper('-y', *argv, 'a.raw8', 'b.raw8')
+    assert 'error' not in capsys.readouterr().err
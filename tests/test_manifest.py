@@ -0,0 +1,76 @@
+import os
+
+from sipper.manifest import MANIFEST_NAME, Manifest, Manifests
+
+
+def touch(path, content=b'data', mtime_ns=None):
+    path.write_bytes(content)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return str(path)
+
+
+def converted(manifest, source, output):
+    """Convert `source` into `output` if the manifest says so."""
+    if not manifest.changed(source, [ output ]):
+        return False
+    open(output, 'w').close()
+    manifest.record(source, [ output ])
+    return True
+
+
+def test_unchanged_inputs_are_skipped_across_runs(tmp_path):
+    source = touch(tmp_path / 'a.raw8')
+    output = str(tmp_path / 'a.csv')
+
+    manifest = Manifest(str(tmp_path))
+    assert converted(manifest, source, output)
+    manifest.save()
+    assert (tmp_path / MANIFEST_NAME).exists()
+
+    manifest = Manifest(str(tmp_path))
+    assert manifest.owns(source, output)
+    assert not converted(manifest, source, output)
+
+    os.remove(output)
+    assert converted(manifest, source, output)
+    touch(tmp_path / 'a.raw8', b'changed')
+    assert converted(manifest, source, output)
+
+
+def test_hash_spares_touched_but_unmodified_inputs(tmp_path):
+    source = touch(tmp_path / 'a.raw8', mtime_ns=10**18)
+    output = str(tmp_path / 'a.csv')
+    manifest = Manifest(str(tmp_path), hash=True)
+    assert converted(manifest, source, output)
+
+    touch(tmp_path / 'a.raw8', mtime_ns=2 * 10**18)
+    assert not converted(manifest, source, output)
+    touch(tmp_path / 'a.raw8', b'atad', mtime_ns=3 * 10**18)
+    assert converted(manifest, source, output)
+
+
+def test_prune_yields_vanished_inputs(tmp_path):
+    manifest = Manifest(str(tmp_path))
+    kept = touch(tmp_path / 'a.raw8')
+    gone = touch(tmp_path / 'b.raw8')
+    for source in (kept, gone):
+        manifest.record(source, [ source + '.csv' ])
+    os.remove(gone)
+    assert [ (gone, [ gone + '.csv' ]) ] == list(manifest.prune())
+    assert [ kept ] == list(manifest.entries)
+
+
+def test_manifests_follow_the_output_directory(tmp_path):
+    one, two = tmp_path / 'one', tmp_path / 'two'
+    one.mkdir()
+    two.mkdir()
+    sources = [ touch(one / 'a.raw8'), touch(two / 'b.raw8') ]
+
+    manifests = Manifests(os.path.dirname)
+    for source in sources:
+        assert converted(manifests, source, source + '.csv')
+    manifests.save()
+    assert (one / MANIFEST_NAME).exists() and (two / MANIFEST_NAME).exists()
+    assert [ sources[0] ] == list(Manifest(str(one)).entries)
+    assert set(sources) == set(manifests.entries)
@@ -0,0 +1,62 @@
+import threading
+import time
+
+from sipper.pipeline import pipeline
+
+
+def test_results_come_in_task_order():
+    def read(task):
+        # later tasks are read sooner
+        time.sleep((10 - task) / 1000)
+        return task * 2
+
+    def write(task, decoded):
+        return decoded + 1
+
+    results = list(pipeline(range(10), read, lambda task, read: read * 10,
+                            write, cost=lambda task: 1, readers=4))
+    assert [ (task, task * 20 + 1, None) for task in range(10) ] == results
+
+
+def test_errors_are_yielded_with_their_task():
+    def decode(task, read):
+        if 2 == task:
+            raise ValueError('cannot decode')
+        return read
+
+    def write(task, decoded):
+        if 3 == task:
+            raise OSError('cannot write')
+        return decoded
+
+    results = list(pipeline(range(5), lambda task: task, decode, write,
+                            cost=lambda task: 1))
+    assert [ 0, 1, 2, 3, 4 ] == [ task for task, _, _ in results ]
+    assert isinstance(results[2][2], ValueError)
+    assert isinstance(results[3][2], OSError)
+    assert [ (4, 4, None) ] == results[4:]
+
+
+def test_reads_wait_within_capacity():
+    lock = threading.Lock()
+    pending = set()
+    peak = 0
+
+    def read(task):
+        nonlocal peak
+        with lock:
+            pending.add(task)
+            peak = max(peak, len(pending))
+        return task
+
+    def write(task, decoded):
+        with lock:
+            pending.discard(task)
+        return decoded
+
+    # a task costlier than the capacity still goes through
+    results = list(pipeline(range(20), read, lambda task, read: read, write,
+                            cost=lambda task: 300 if 5 == task else 100,
+                            readers=8, capacity=250))
+    assert list(range(20)) == [ result for _, result, _ in results ]
+    assert peak <= 2
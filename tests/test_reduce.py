@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from sipper.reduce import STATISTICS, Reduce, parse_statistics
+
+from conftest import make_frame
+
+
+def reduced(frames, statistics=STATISTICS, dark=None):
+    reduce = Reduce(statistics, len(frames), dark)
+    try:
+        for frame in frames:
+            reduce.append(frame)
+        return reduce.result()
+    finally:
+        reduce.close()
+
+
+def test_matches_numpy():
+    frames = [ make_frame(samples=600, seed=seed) for seed in range(7) ]
+    data = reduced(frames)
+    assert 7 == data.attrs['input_count']
+    np.testing.assert_array_equal(
+        frames[0]['wavelength (nm)'], data['wavelength (nm)'])
+
+    stack = np.stack([ frame.to_numpy()[:, 1:] for frame in frames ])
+    expected = {
+        'mean': stack.astype(np.float64).mean(axis=0),
+        'std': stack.astype(np.float64).std(axis=0, ddof=1),
+        'min': stack.min(axis=0),
+        'max': stack.max(axis=0),
+        'median': np.median(stack, axis=0)
+    }
+    for index, column in enumerate([ 'y', 'z' ]):
+        for statistic, values in expected.items():
+            np.testing.assert_allclose(data[f'{column} {statistic}'],
+                values[:, index], rtol=1e-6, err_msg=statistic)
+
+
+def test_dark_is_subtracted():
+    frames = [ make_frame(samples=50, seed=seed) for seed in range(3) ]
+    dark = make_frame(samples=50, seed=99)
+    data = reduced(frames, [ 'mean' ], dark)
+    stack = np.stack([ frame.to_numpy()[:, 1:] for frame in frames ])
+    np.testing.assert_allclose(data[[ 'y mean', 'z mean' ]],
+        stack.mean(axis=0) - dark.to_numpy()[:, 1:], rtol=1e-5, atol=1e-6)
+
+
+def test_single_frame_has_no_deviation():
+    data = reduced([ make_frame(samples=10) ], [ 'mean', 'std' ])
+    assert data['y std'].isna().all()
+
+
+def test_differing_wavelengths_are_rejected():
+    reduce = Reduce([ 'mean' ], 2)
+    reduce.append(make_frame(samples=10))
+    with pytest.raises(ValueError):
+        reduce.append(make_frame(samples=10, start=300.0))
+    reduce.close()
+
+
+def test_parse_statistics():
+    assert [ 'mean', 'median' ] == parse_statistics(' Mean, median,')
+    with pytest.raises(ValueError):
+        parse_statistics('mean,mode')
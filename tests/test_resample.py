@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from sipper.resample import grid, resample
+
+
+def series(wavelengths, seed=0):
+    rng = np.random.default_rng(seed)
+    values = rng.random((len(wavelengths), 2), dtype=np.float32)
+    return np.column_stack([ wavelengths, values ]).astype(np.float32)
+
+
+def test_matches_np_interp():
+    source = series(np.float32(200) + np.cumsum(np.full(500, 0.37, np.float32)))
+    target = grid('210:380:0.5', None)
+    result = resample(source, target)
+    np.testing.assert_array_equal(target, result[:, 0])
+    for axis in (1, 2):
+        np.testing.assert_allclose(result[:, axis],
+            np.interp(target, source[:, 0], source[:, axis]), rtol=1e-5)
+
+
+def test_outside_the_source_range_is_nan():
+    source = series(np.arange(100, 200, dtype=np.float32))
+    result = resample(source, np.array([ 50, 100, 150.5, 199, 250 ], np.float32))
+    assert np.isnan(result[[ 0, 4 ], 1:]).all()
+    assert not np.isnan(result[1:4, 1:]).any()
+
+
+def test_unsorted_source_is_sorted_first():
+    source = series(np.arange(100, 200, dtype=np.float32))
+    target = np.linspace(100, 199, 37, dtype=np.float32)
+    shuffled = source[np.random.default_rng(1).permutation(len(source))]
+    np.testing.assert_allclose(resample(source, target),
+                               resample(shuffled, target))
+
+
+def test_grid_spec():
+    np.testing.assert_allclose([ 1.0, 1.5, 2.0, 2.5, 3.0 ], grid('1:3:0.5', None))
+    np.testing.assert_allclose([ 0, 2 ], grid('0:3:2', None))
+    with pytest.raises(ValueError):
+        grid('3:1:1', None)
+    assert [ 4, 5 ] == grid('reference', lambda path: [ 4, 5 ]).tolist()
@@ -0,0 +1,117 @@
+import io
+import os
+
+import numpy as np
+import pytest
+
+from sipper import Parcel
+from sipper.driver.avs84 import (AXIS_LABELS, HEADER, SERIES_DTYPE,
+                                 AVS84Driver, Selection, read_ranges,
+                                 read_selected_series)
+
+from conftest import make_frame, write_raw8
+
+
+class CountingIO(io.BytesIO):
+    """Counts the reads made through it."""
+    reads = 0
+
+    def read(self, size=-1):
+        self.reads += 1
+        return super().read(size)
+
+
+@pytest.fixture(scope='module')
+def raw8(tmp_path_factory):
+    path = tmp_path_factory.mktemp('selection') / 'a.raw8'
+    return write_raw8(path, make_frame())
+
+
+def selected(path, buffered, **selection):
+    parcel = Parcel(**selection)
+    if buffered:
+        handle = io.BytesIO(path.read_bytes())
+    else:
+        handle = open(path, 'rb', buffering=0)
+    with handle:
+        return AVS84Driver().read(parcel, handle).data[0].object
+
+
+@pytest.mark.parametrize('buffered', [ False, True ])
+@pytest.mark.parametrize('selection, axes, rows', [
+    ({ 'axes': 'z' }, [ 2 ], slice(None)),
+    ({ 'axes': 'z,wavelength' }, [ 2, 0 ], slice(None)),
+    ({ 'axes': '1,1' }, [ 1, 1 ], slice(None)),
+    ({ 'samples': '100:200' }, [ 0, 1, 2 ], slice(100, 200)),
+    ({ 'samples': '-10:' }, [ 0, 1, 2 ], slice(3390, 3400)),
+    ({ 'samples': '3000:5000', 'axes': 'y' }, [ 1 ], slice(3000, 3400)),
+    ({ 'wavelength': '300:400' }, [ 0, 1, 2 ], slice(400, 801)),
+    ({ 'wavelength': ':250.5', 'axes': 'y' }, [ 1 ], slice(0, 203)),
+    ({ 'wavelength': '300:400', 'samples': '500:600', 'axes': 'z' },
+     [ 2 ], slice(500, 600)) ])
+def test_matches_full_read(raw8, buffered, selection, axes, rows):
+    full = selected(raw8, buffered).to_numpy()
+    data = selected(raw8, buffered, **selection)
+    np.testing.assert_array_equal(full[rows][:, axes], data.to_numpy())
+    assert [ AXIS_LABELS[axis] for axis in axes ] == list(data.columns)
+    start, stop, _ = rows.indices(3400)
+    assert f'{start}:{stop}' == data.attrs['sample_range']
+
+
+def test_empty_wavelength_window(raw8):
+    data = selected(raw8, False, wavelength='5000:6000')
+    assert (0, 3) == data.shape
+    assert '0:0' == data.attrs['sample_range']
+
+
+def test_bytes_read_and_depth_reached(raw8):
+    with open(raw8, 'rb', buffering=0) as fin:
+        fin.seek(HEADER.size)
+        series, labels, sample_range, read = read_selected_series(
+            fin, 3400, 3, AXIS_LABELS, Selection('z,y,z', '10:20'))
+        assert [ 'z', 'y', 'z' ] == labels
+        assert (10, 20) == sample_range
+        # the duplicate axis is read once
+        assert 2 * 10 * SERIES_DTYPE.itemsize == read
+        assert HEADER.size + SERIES_DTYPE.itemsize * (2 * 3400 + 20) == fin.tell()
+
+
+def test_short_reads_are_refused(raw8):
+    data = raw8.read_bytes()[:HEADER.size + SERIES_DTYPE.itemsize * 3500]
+    with pytest.raises(ValueError):
+        AVS84Driver().read(Parcel(axes='z'), io.BytesIO(data))
+    # what is there is still read
+    read = AVS84Driver().read(Parcel(axes='y', samples=':50'), io.BytesIO(data))
+    assert (50, 1) == read.data[0].object.shape
+
+
+def test_adjacent_ranges_are_merged():
+    handle = CountingIO(bytes(range(256)))
+    buffers = read_ranges(handle, [ (20, 5), (10, 10), (10, 10), (40, 1) ])
+    assert 2 == handle.reads
+    assert [ bytes(range(20, 25)), bytes(range(10, 20)), bytes(range(10, 20)),
+             bytes([ 40 ]) ] == [ bytes(b) for b in buffers ]
+
+
+def test_read_ranges_without_pread(tmp_path, monkeypatch):
+    path = tmp_path / 'a.bin'
+    path.write_bytes(bytes(range(256)))
+    ranges = [ (10, 4), (14, 2), (100, 3) ]
+    with open(path, 'rb', buffering=0) as fin:
+        expected = [ bytes(b) for b in read_ranges(fin, ranges) ]
+    monkeypatch.delattr(os, 'pread')
+    with open(path, 'rb', buffering=0) as fin:
+        assert expected == [ bytes(b) for b in read_ranges(fin, ranges) ]
+    assert [ bytes(range(10, 14)), bytes([ 14, 15 ]), bytes([ 100, 101, 102 ]) ] \
+           == expected
+
+
+def test_selection_parsing():
+    with pytest.raises(ValueError):
+        Selection(samples='10')
+    with pytest.raises(ValueError):
+        Selection(wavelength='300')
+    with pytest.raises(ValueError):
+        Selection(axes='w').indices(AXIS_LABELS)
+    assert Selection.from_parcel(Parcel()) is None
+    assert (5, 5) == Selection(samples='5:2').range(10)
@@ -0,0 +1,63 @@
+import csv
+
+import numpy as np
+import pytest
+
+from sipper.stack import Stack, shrink
+
+from conftest import make_frame
+
+
+def test_stack_rows_and_index(tmp_path):
+    path = str(tmp_path / 'cube.npy')
+    frames = [ make_frame(samples=20, seed=seed, serial=f'S{seed}')
+               for seed in range(3) ]
+    stack = Stack(path, 3)
+    for index, frame in enumerate(frames):
+        stack.append(f'{index}.raw8', frame)
+    stack.close()
+
+    cube = np.load(path)
+    assert (3, 3, 20) == cube.shape
+    for row, frame in zip(cube, frames):
+        np.testing.assert_array_equal(frame.to_numpy().T, row)
+
+    with open(tmp_path / 'cube.index.csv', newline='') as fin:
+        rows = list(csv.DictReader(fin))
+    assert [ '0', '1', '2' ] == [ row['row'] for row in rows ]
+    assert [ 'S0', 'S1', 'S2' ] == [ row['spectrometer_serial'] for row in rows ]
+
+
+def test_close_shrinks_to_appended_rows(tmp_path):
+    path = str(tmp_path / 'cube.npy')
+    frames = [ make_frame(samples=20, seed=seed) for seed in range(2) ]
+    stack = Stack(path, 1000)
+    for frame in frames:
+        stack.append('a.raw8', frame)
+    stack.close()
+
+    cube = np.load(path)
+    assert (2, 3, 20) == cube.shape
+    np.testing.assert_array_equal(frames[1].to_numpy().T, cube[1])
+
+
+def test_mismatched_and_excess_frames_are_rejected(tmp_path):
+    stack = Stack(str(tmp_path / 'cube.npy'), 1)
+    stack.append('a.raw8', make_frame(samples=20))
+    with pytest.raises(ValueError):
+        stack.append('b.raw8', make_frame(samples=21))
+    with pytest.raises(ValueError):
+        stack.append('c.raw8', make_frame(samples=20))
+    stack.close()
+
+
+@pytest.mark.parametrize('version', [ (1, 0), (2, 0) ])
+def test_shrink(tmp_path, version):
+    path = tmp_path / 'a.npy'
+    array = np.arange(1000 * 4, dtype=np.float32).reshape(1000, 4)
+    with open(path, 'wb') as fout:
+        np.lib.format.write_array(fout, array, version=version)
+    shrink(path, 7)
+    np.testing.assert_array_equal(array[:7], np.load(path))
+    shrink(path, 0)
+    assert (0, 4) == np.load(path).shape
@@ -0,0 +1,46 @@
+import json
+import time
+
+from sipper.stats import STAGES, Report, Stats, excluding
+
+
+def test_stage_and_add():
+    stats = Stats()
+    with stats.stage('series'):
+        time.sleep(0.01)
+    stats.bytes_read = 10
+    total = Stats()
+    total.add(stats)
+    total.add(stats)
+    assert 0.01 <= stats.seconds['series']
+    assert 2 * stats.seconds['series'] == total.seconds['series']
+    assert 20 == total.bytes_read
+    assert STAGES == list(total.to_dict()['seconds'])
+
+
+def test_excluding_takes_producer_time_out():
+    def produce():
+        time.sleep(0.02)
+        yield 1
+
+    stats = Stats()
+    with stats.stage('write'):
+        assert [ 1 ] == list(excluding(stats, 'write', produce()))
+    assert stats.seconds['write'] < 0.01
+
+
+def test_report_save(tmp_path):
+    report = Report()
+    stats = Stats()
+    stats.bytes_read = 100
+    report.add('a.raw8', stats)
+    report.add('b.raw8', stats)
+    report.coalesced.bytes_written = 7
+    report.save(tmp_path / 'stats.json')
+
+    with open(tmp_path / 'stats.json') as fin:
+        saved = json.load(fin)
+    assert [ 'a.raw8', 'b.raw8' ] == [ f['input'] for f in saved['files'] ]
+    assert 2 == saved['total']['files']
+    assert 200 == saved['total']['bytes_read']
+    assert 7 == saved['total']['bytes_written']
@@ -0,0 +1,50 @@
+from io import BytesIO
+
+from sipper import Parcel
+from sipper.__main__ import read_avs84_header
+from sipper.driver.avs84 import FOOTER, HEADER, AVS84Driver, recognized
+from sipper.verify import check, classify, verify
+
+from conftest import make_frame, write_raw8
+
+
+DEPTH = HEADER.size + 4 * 3400 * 3
+
+
+def test_classify(tmp_path):
+    head = write_raw8(tmp_path / 'a.raw8', make_frame()).read_bytes()[:HEADER.size]
+    assert 'good' == classify(head, DEPTH, DEPTH)[0]
+    assert 'truncated' == classify(head, DEPTH - 1, DEPTH)[0]
+    assert ('unrecognized', None) == classify(head[:-1], DEPTH, DEPTH)
+    assert 'unrecognized' == classify(b'X' + head[1:], DEPTH, DEPTH)[0]
+
+
+def test_verify_directory(tmp_path):
+    data = write_raw8(tmp_path / 'a.raw8', make_frame()).read_bytes()
+    assert DEPTH + len(FOOTER) == len(data)
+    # the footer is not checked
+    (tmp_path / 'b.raw8').write_bytes(data[:DEPTH])
+    (tmp_path / 'c.raw8').write_bytes(data[:DEPTH - 4])
+    (tmp_path / 'd.raw8').write_bytes(b'AVS')
+    (tmp_path / 'notes.txt').write_bytes(b'')
+
+    records = list(verify([ str(tmp_path), str(tmp_path / 'missing.raw8') ],
+                          DEPTH, 2))
+    assert [ 'good', 'good', 'truncated', 'unrecognized', 'error' ] == \
+           [ record['status'] for record in records ]
+    assert DEPTH == records[0]['series_depth']
+    assert 'SIPPER000' == records[0]['spectrometer_serial']
+    assert 'error' == check({ 'path': 'x', 'status': 'error' }, DEPTH)['status']
+
+
+def test_criteria_are_shared(tmp_path):
+    head = write_raw8(tmp_path / 'a.raw8', make_frame()).read_bytes()[:HEADER.size]
+    # a serial not confirmed by its second copy
+    bad = head[:0x10] + b'X' + head[0x11:]
+    for data in (head, bad):
+        expected = recognized(HEADER.unpack(data), HEADER.size)
+        assert expected == ('good' == classify(data, DEPTH, DEPTH)[0])
+        assert expected == read_avs84_header(Parcel(), BytesIO(data))[1]
+        assert expected == \
+               AVS84Driver().read(Parcel(), BytesIO(data), probe=True).recognized
+    assert not recognized(HEADER.unpack(head), HEADER.size - 1)